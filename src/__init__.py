@@ -0,0 +1,4 @@
+"""NLtoSPARQL: natural language to SPARQL query generation using LLMs."""
+
+# Kept in sync with the version in pyproject.toml
+__version__ = "0.1.0"
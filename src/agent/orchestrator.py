@@ -1,22 +1,144 @@
 """Agent orchestrator for NL-to-SPARQL conversion using function calling."""
 
-import json
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Any, Tuple
 
-from ..llm.base import BaseLLM, LLMMessage, LLMResponse
+from ..llm.base import BaseLLM, FunctionCall, LLMMessage, LLMResponse
 from ..functions.registry import FunctionRegistry
-from ..functions.base import FunctionResult
+from ..functions.base import FunctionResult, json_dumps
+from ..utils.config import load_config
+
+
+logger = logging.getLogger(__name__)
+
+# Background listener writing verbose progress output, started on first use
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+# Placeholder handed to the LLM for function calls still running in the background
+_FUTURE_RE = re.compile(r"<future:([0-9a-f]+)>")
+
+# Fenced SPARQL code block in an LLM response
+_SPARQL_BLOCK_RE = re.compile(r"```(?:sparql)?[ \t]*\n(.+?)```", re.DOTALL | re.IGNORECASE)
+
+# SPARQL query in free text: optional PREFIX declarations, the query form and
+# its WHERE block up to the last closing brace
+_SPARQL_RE = re.compile(
+    r'(?:PREFIX\s[^{]*?)?\b(?:SELECT|CONSTRUCT|ASK)\b.*?WHERE\s*\{.*\}',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Keywords that indicate the LLM is trying to conclude
+_CONCLUDING_KEYWORDS = (
+    'final query', 'answer is', 'here is the sparql', 'i conclude',
+    'i cannot', 'the answer', 'sparql query', 'query is'
+)
+
+# Single pass over the content instead of one substring scan per keyword
+_CONCLUDE_RE = re.compile(
+    "|".join(re.escape(keyword) for keyword in _CONCLUDING_KEYWORDS),
+    re.IGNORECASE
+)
+
+
+def _enable_verbose_output():
+    """
+    Send this module's log records to stdout from a background thread.
+    
+    Records are put on a queue by the event loop thread, so formatting and
+    writing to the terminal never block the agent loop.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt="%H:%M:%S"))
+    
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    _log_listener = logging.handlers.QueueListener(log_queue, handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+@dataclass
+class FunctionCallRecord:
+    """Record of one executed function call."""
+    
+    __slots__ = ('iteration', 'function', 'arguments', 'result', 'error', 'success')
+    
+    iteration: int
+    function: str
+    arguments: Dict[str, Any]
+    result: Any
+    error: Optional[str]
+    success: bool
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to the dictionary form used in results."""
+        return {
+            'iteration': self.iteration,
+            'function': self.function,
+            'arguments': self.arguments,
+            'result': self.result,
+            'error': self.error,
+            'success': self.success
+        }
+
+
+@dataclass
+class RunState:
+    """Mutable state of a single question run."""
+    
+    question: str = ""
+    kg_name: str = ""
+    conversation_history: List[LLMMessage] = field(default_factory=list)
+    function_results: List[FunctionCallRecord] = field(default_factory=list)
+    iteration_count: int = 0
+    feedback_loops: int = 0
+    continue_prompt_count: int = 0
+    futures: Dict[str, asyncio.Task] = field(default_factory=dict)
+    future_calls: Dict[str, FunctionCall] = field(default_factory=dict)
+    # Bookkeeping updated as results are recorded, so checks stay O(1)
+    has_validated_query: bool = False
+    function_counts: Counter = field(default_factory=Counter)
+    success_count: int = 0
+    fail_count: int = 0
+    # Successful results of read-only function calls, keyed by call
+    tool_cache: Dict[Tuple[str, str], FunctionResult] = field(default_factory=dict)
+    # Speculatively started function calls: call key -> (iteration, task)
+    speculations: Dict[Tuple[str, str], Tuple[int, asyncio.Task]] = field(default_factory=dict)
+    # Positions of function result messages still shown in full, oldest first
+    function_messages: List[Tuple[int, str]] = field(default_factory=list)
 
 
 class AgentOrchestrator:
     """Orchestrates the NL-to-SPARQL conversion process using LLM with function calling."""
     
     # Keywords that indicate the LLM is trying to conclude
-    CONCLUDING_KEYWORDS = [
-        'final query', 'answer is', 'here is the sparql', 'i conclude', 
-        'i cannot', 'the answer', 'sparql query', 'query is'
-    ]
+    CONCLUDING_KEYWORDS = _CONCLUDING_KEYWORDS
+    
+    # Functions that end the run
+    TERMINAL_FUNCTIONS = ('answer', 'cancel')
+    
+    # Read-only functions whose results can be reused within a run
+    CACHEABLE_FUNCTIONS = frozenset({
+        'search_entity', 'search_property', 'list_triples', 'execute_query',
+        'discover_properties', 'get_entity_properties',
+        'find_relationship_paths', 'explore_property_values'
+    })
     
     def __init__(
         self,
@@ -27,7 +149,15 @@ class AgentOrchestrator:
         max_feedback_loops: int = 2,
         verbose: bool = False,
         ontology_content: Optional[str] = None,
-        event_callback: Optional[Any] = None
+        event_callback: Optional[Any] = None,
+        parallel_tools: bool = True,
+        async_function_calls: bool = False,
+        max_concurrency: int = 4,
+        max_tool_result_chars: Optional[int] = 20000,
+        history_window: Optional[int] = None,
+        include_history: bool = False,
+        speculative_execution: bool = False,
+        stream_function_calls: bool = True
     ):
         self.llm = llm
         self.function_registry = function_registry
@@ -35,38 +165,87 @@ class AgentOrchestrator:
         self.enable_feedback = enable_feedback
         self.max_feedback_loops = max_feedback_loops
         self.verbose = verbose
+        if verbose:
+            _enable_verbose_output()
         self.ontology_content = ontology_content
         self.event_callback = event_callback
+        # Run the function calls of a single LLM response concurrently.
+        # Disable to serialize calls that depend on each other.
+        self.parallel_tools = parallel_tools
+        # Hand out <future:ID> placeholders for non-terminal function calls so
+        # the LLM can keep planning while endpoint queries are still running.
+        self.async_function_calls = async_function_calls
+        
+        # Upper bound on questions processed at once by process_questions
+        self.max_concurrency = max_concurrency
+        # Cap on the serialized function result sent back to the LLM (None = no cap)
+        self.max_tool_result_chars = max_tool_result_chars
+        # Number of most recent function results kept in full in the history;
+        # older ones are replaced by a one-line summary (None = keep all)
+        self.history_window = history_window
+        # Serialize the conversation into final results (costly for long runs;
+        # the last run's messages stay available via conversation_history)
+        self.include_history = include_history
+        # Run a query the LLM proposed but has not validated while it is asked
+        # to validate it, so the expected execute_query call is already underway
+        self.speculative_execution = speculative_execution
+        # Start executing function calls while the LLM response is still being
+        # streamed (used with parallel_tools and without async_function_calls)
+        self.stream_function_calls = stream_function_calls
         
-        self.conversation_history: List[LLMMessage] = []
-        self.function_results: List[Dict[str, Any]] = []
-        self.iteration_count = 0
-        self.feedback_loops = 0
-        self._continue_prompt_count = 0
         self._max_continue_prompts = 3
+        # The LLM client is warmed up once, before the first question
+        self._llm_warmed_up = False
+        # State of the most recent process_question() run, exposed through the
+        # properties below; concurrent runs of process_questions() keep theirs
+        self._state = RunState()
+        
+        # Available knowledge graphs, resolved once from the cached config
+        endpoints = load_config().get('endpoints', {}) or {}
+        self._kg_list_str = ", ".join(endpoints.keys())
+        
+        # Formatted functions block, keyed by the registry version it was built from
+        self._functions_prompt_cache: Optional[Tuple[int, str]] = None
+        # Static system prompts, keyed by knowledge graph and registry version
+        self._system_prompt_cache: Dict[Tuple[str, int], str] = {}
         
+    @property
+    def conversation_history(self) -> List[LLMMessage]:
+        """Conversation history of the most recent process_question() run."""
+        return self._state.conversation_history
+    
+    @property
+    def function_results(self) -> List[Dict[str, Any]]:
+        """Function results of the most recent process_question() run, as dictionaries."""
+        return [record.to_dict() for record in self._state.function_results]
+    
+    @property
+    def iteration_count(self) -> int:
+        """Iteration count of the most recent process_question() run."""
+        return self._state.iteration_count
+    
     def _log(self, message: str):
         """Log message if verbose mode is enabled."""
         if self.verbose:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}] {message}")
+            logger.info(message)
     
     async def _emit(self, event_type: str, data: Dict[str, Any]):
         """Emit an event to the callback if registered."""
         if self.event_callback is not None:
             await self.event_callback(event_type, data)
     
-    def _create_system_prompt(self, question: str, kg_name: str) -> str:
-        """Create the system prompt for the LLM."""
-        # Get available knowledge graphs from config
-        import yaml
-        import os
-        config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+    def _static_system_prompt(self, kg_name: str) -> str:
+        """
+        Create the system prompt for the LLM.
         
-        endpoints = config.get('endpoints', {})
-        kg_list = ", ".join(endpoints.keys())
+        The prompt does not depend on the question, which is sent as a separate
+        user message, so it is byte-identical across questions and providers
+        can serve it from their prefix cache.
+        """
+        cache_key = (kg_name, self.function_registry.version)
+        cached = self._system_prompt_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Format functions for prompt
         functions_prompt = self._format_functions_for_prompt()
@@ -103,41 +282,53 @@ How to get to a proper query:
 3. If a function returns an error or zero results, DO NOT run the same function with the same parameters again, try different parameters or another function.
 4. YOU MUST TRY THE QUERY before answering by using the function execute_query!
 5. If the execute_query function provides an expected result, use the answer function with the EXACT same query you just tested, do no change it! Remember to include EVERY needed PREFIXes.
-
-Question: {question}
-
 """
         prompt_parts.append(instructions.strip())
         
-        return "\n\n".join(prompt_parts)
+        system_prompt = "\n\n".join(prompt_parts)
+        self._system_prompt_cache[cache_key] = system_prompt
+        return system_prompt
+    
+    def _function_definitions(self) -> List[Dict[str, Any]]:
+        """Get the registry's function definitions; the registry caches them."""
+        return self.function_registry.get_function_definitions()
     
     def _format_functions_for_prompt(self) -> str:
         """Format function definitions for the prompt."""
-        functions = self.function_registry.get_function_definitions()
-        formatted = []
+        version = self.function_registry.version
+        if self._functions_prompt_cache is not None and self._functions_prompt_cache[0] == version:
+            return self._functions_prompt_cache[1]
         
-        for func in functions:
-            name = func.get('name', '')
-            description = func.get('description', '')
-            params = func.get('parameters', {}).get('properties', {})
-            required = func.get('parameters', {}).get('required', [])
+        formatted = []
+        for func in self._function_definitions():
+            parameters = func.get('parameters', {})
+            required = parameters.get('required', [])
             
-            param_lines = []
-            for param_name, param_schema in params.items():
-                param_type = param_schema.get('type', 'any')
-                param_desc = param_schema.get('description', '')
-                required_marker = " (required)" if param_name in required else ""
-                param_lines.append(f"    - {param_name}: {param_type}{required_marker} - {param_desc}")
+            param_lines = [
+                f"    - {param_name}: {param_schema.get('type', 'any')}"
+                f"{' (required)' if param_name in required else ''}"
+                f" - {param_schema.get('description', '')}"
+                for param_name, param_schema in parameters.get('properties', {}).items()
+            ]
             
             param_str = "\n" + "\n".join(param_lines) if param_lines else ""
-            formatted.append(f"{name}: {description}{param_str}")
+            formatted.append(f"{func.get('name', '')}: {func.get('description', '')}{param_str}")
         
-        return "\n\n".join(formatted)
+        functions_prompt = "\n\n".join(formatted)
+        self._functions_prompt_cache = (version, functions_prompt)
+        return functions_prompt
     
     def _format_function_result_for_message(self, function_name: str, result: FunctionResult) -> str:
         """Format function result for inclusion in conversation history."""
         if result.success:
-            result_str = json.dumps(result.result, indent=2)
+            # Compact JSON: indentation only costs time and prompt tokens
+            result_str = json_dumps(result.result)
+            limit = self.max_tool_result_chars
+            if limit is not None and len(result_str) > limit:
+                result_str = (
+                    f"{result_str[:limit]}... "
+                    f"[truncated, {len(result_str) - limit} more characters]"
+                )
             return f"Function {function_name} succeeded:\n{result_str}"
         else:
             return f"Function {function_name} failed: {result.error}"
@@ -148,38 +339,105 @@ Question: {question}
         kg_name: str = "wikidata"
     ) -> Dict[str, Any]:
         """Process a natural language question and generate SPARQL query."""
-        self._log(f"Starting processing of question: {question}")
-        self._log(f"Target knowledge graph: {kg_name}")
-        
-        # Reset state
-        self.conversation_history = []
-        self.function_results = []
-        self.iteration_count = 0
-        self.feedback_loops = 0
-        self._continue_prompt_count = 0
-        
-        # Create system prompt
-        system_prompt = self._create_system_prompt(question, kg_name)
-        self.conversation_history.append(
+        # Fresh per-run state, published for the properties and the summary
+        state = RunState(question=question, kg_name=kg_name)
+        self._state = state
+        return await self._process(state)
+    
+    async def _process(self, state: RunState) -> Dict[str, Any]:
+        """Run the agent for the question of a fresh run state."""
+        self._log(f"Starting processing of question: {state.question}")
+        self._log(f"Target knowledge graph: {state.kg_name}")
+        
+        if not self._llm_warmed_up:
+            self._llm_warmed_up = True
+            await self.llm.warmup()
+        
+        # Create system prompt (static, so it stays a cacheable prefix)
+        system_prompt = self._static_system_prompt(state.kg_name)
+        state.conversation_history.append(
             LLMMessage(role="system", content=system_prompt)
         )
         
         # Add user question
-        self.conversation_history.append(
-            LLMMessage(role="user", content=question)
+        state.conversation_history.append(
+            LLMMessage(role="user", content=f"Question: {state.question}")
         )
         
-        # Main loop
-        while self.iteration_count < self.max_iterations:
-            self.iteration_count += 1
-            self._log(f"Iteration {self.iteration_count}/{self.max_iterations}")
+        try:
+            return await self._run_loop(state)
+        finally:
+            self._cancel_futures(state)
+            self._cancel_speculations(state)
+    
+    async def process_questions(
+        self,
+        questions: List[str],
+        kg_name: str = "wikidata"
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several questions concurrently with this orchestrator.
+        
+        Each question gets its own RunState; the LLM client, function registry
+        and prompt caches are shared. At most ``max_concurrency`` questions
+        run at once. The runs are not published to the conversation_history,
+        function_results and iteration_count properties or to
+        get_execution_summary(); each result carries its own execution
+        summary under ``summary`` instead.
+        
+        Args:
+            questions: Natural language questions
+            kg_name: Target knowledge graph for all questions
+            
+        Returns:
+            Results in the same order as the questions
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        
+        async def run_one(question: str) -> Dict[str, Any]:
+            state = RunState(question=question, kg_name=kg_name)
+            async with semaphore:
+                try:
+                    result = await self._process(state)
+                except Exception as e:
+                    result = self._create_error_result(state, str(e))
+            result['summary'] = self.get_execution_summary(state)
+            return result
+        
+        return list(await asyncio.gather(*(run_one(q) for q in questions)))
+    
+    async def _run_loop(self, state: RunState) -> Dict[str, Any]:
+        """Run the LLM/function-calling loop until answer, cancel or timeout."""
+        while state.iteration_count < self.max_iterations:
+            state.iteration_count += 1
+            self._log(f"Iteration {state.iteration_count}/{self.max_iterations}")
+            
+            # Speculations are only useful for the response that follows them
+            if state.speculations:
+                self._cancel_speculations(state, before_iteration=state.iteration_count - 1)
+            
+            # Hand over results of placeholder calls that finished meanwhile
+            if state.futures:
+                await self._resolve_futures(state, wait=False)
             
-            # Get LLM response
-            llm_response = await self._get_llm_response()
+            # Get LLM response, starting function calls as they are streamed
+            started: Dict[int, Tuple[Tuple[str, str], asyncio.Task]] = {}
+            on_function_call = None
+            if self.stream_function_calls and self.parallel_tools and not self.async_function_calls:
+                on_function_call = self._early_dispatcher(state, started)
+            llm_response = await self._get_llm_response(state, on_function_call)
             
             if not llm_response:
+                self._cancel_started(started)
                 await self._emit("error", {"message": "LLM failed to respond"})
-                return self._create_error_result("LLM failed to respond")
+                return self._create_error_result(state, "LLM failed to respond")
+            
+            # Classify the response once for the checks below
+            finished = (
+                llm_response.finish_reason in ["stop", "length"]
+                and not llm_response.function_calls
+            )
+            concluding = bool(llm_response.content) and self._is_concluding(llm_response.content)
             
             # Check for function calls
             if llm_response.function_calls:
@@ -193,71 +451,64 @@ Question: {question}
                     function_call=first_call
                 )
                 
-                self.conversation_history.append(assistant_message)
+                state.conversation_history.append(assistant_message)
                 
-                # Execute function calls
-                all_successful = True
-                for function_call in llm_response.function_calls:
-                    function_name = function_call.name
-                    arguments = function_call.arguments
-                    
-                    self._log(f"Executing function: {function_name} with args: {arguments}")
-                    await self._emit("function_call", {
-                        "iteration": self.iteration_count,
-                        "function": function_name,
-                        "arguments": arguments
-                    })
-                    
-                    # Execute function
-                    result = await self.function_registry.execute_function(
-                        function_name, arguments
+                # Execute function calls; nothing after answer/cancel can matter,
+                # since the run ends there
+                function_calls = llm_response.function_calls
+                terminal_index = next(
+                    (i for i, fc in enumerate(function_calls) if fc.name in self.TERMINAL_FUNCTIONS),
+                    None
+                )
+                if terminal_index is not None and terminal_index + 1 < len(function_calls):
+                    self._log(
+                        f"Skipping {len(function_calls) - terminal_index - 1} function call(s) "
+                        f"after {function_calls[terminal_index].name}"
                     )
-                    
-                    # Record result
-                    self.function_results.append({
-                        'iteration': self.iteration_count,
-                        'function': function_name,
-                        'arguments': arguments,
-                        'result': result.result if result.success else None,
-                        'error': result.error if not result.success else None,
-                        'success': result.success
-                    })
-                    
-                    await self._emit("function_result", {
-                        "iteration": self.iteration_count,
-                        "function": function_name,
-                        "success": result.success,
-                        "result": result.result if result.success else None,
-                        "error": result.error if not result.success else None
-                    })
-                    
-                    # Add function result to conversation
-                    result_message = self._format_function_result_for_message(
-                        function_name, result
+                    function_calls = function_calls[:terminal_index + 1]
+                
+                if self.async_function_calls:
+                    function_calls = await self._dispatch_futures(state, function_calls)
+                
+                results: Optional[List[Any]] = None
+                if started or (self.parallel_tools and len(function_calls) > 1):
+                    # Calls are I/O-bound, so overlap their network latency;
+                    # calls started during streaming are awaited, not rerun
+                    results = await asyncio.gather(
+                        *(
+                            self._take_started(started, index, fc)
+                            or self._execute_function_call(state, fc)
+                            for index, fc in enumerate(function_calls)
+                        ),
+                        return_exceptions=True
                     )
+                    self._cancel_started(started)
+                
+                all_successful = True
+                for index, function_call in enumerate(function_calls):
+                    function_name = function_call.name
                     
-                    # Use tool_call_id if available (for OpenAI tools API)
-                    message_name = function_name
-                    if function_call.tool_call_id:
-                        message_name = function_call.tool_call_id
+                    if results is None:
+                        result = await self._execute_function_call(state, function_call)
+                    else:
+                        result = results[index]
+                        if isinstance(result, BaseException):
+                            result = FunctionResult(
+                                success=False,
+                                error=f"Function execution failed: {str(result)}"
+                            )
                     
-                    self.conversation_history.append(
-                        LLMMessage(
-                            role="function",
-                            name=message_name,
-                            content=result_message
-                        )
-                    )
+                    await self._record_function_result(state, function_call, result)
                     
                     # Check if this is an answer or cancel function
                     if function_name == "answer":
                         self._log("Answer function called - process complete")
                         await self._emit("complete", {"status": "success"})
-                        return self._process_answer_result(result)
+                        return self._process_answer_result(state, result)
                     elif function_name == "cancel":
                         self._log("Cancel function called - process complete")
                         await self._emit("complete", {"status": "cancelled"})
-                        return self._process_cancel_result(result)
+                        return self._process_cancel_result(state, result)
                     
                     if not result.success:
                         all_successful = False
@@ -270,6 +521,15 @@ Question: {question}
                     # Give LLM a chance to recover from function errors
                     continue
             
+            # The LLM stopped to wait for pending results - deliver them
+            elif state.futures:
+                if llm_response.content:
+                    state.conversation_history.append(
+                        LLMMessage(role="assistant", content=llm_response.content)
+                    )
+                await self._resolve_futures(state, wait=True)
+                continue
+            
             # If no function calls, check if we have a text response
             elif llm_response.content:
                 # Show more of the reasoning in verbose mode
@@ -279,72 +539,47 @@ Question: {question}
                     self._log(f"LLM reasoning: {llm_response.content[:400]}...")
                 
                 await self._emit("reasoning", {
-                    "iteration": self.iteration_count,
+                    "iteration": state.iteration_count,
                     "content": llm_response.content
                 })
                 
                 # Add assistant message to history
-                self.conversation_history.append(
+                state.conversation_history.append(
                     LLMMessage(role="assistant", content=llm_response.content)
                 )
                 
                 # Check if the response seems to be concluding WITHOUT validation
-                # We should only prompt for answer if we have validated queries
-                has_validated_query = self._has_validated_query()
-                
-                if llm_response.content and self._is_concluding(llm_response.content):
-                    if has_validated_query:
-                        self._log("LLM appears to be concluding with validated query - prompting for answer function")
-                        self.conversation_history.append(
-                            LLMMessage(
-                                role="user",
-                                content="Please use the answer function to provide the final SPARQL query and answer."
-                            )
-                        )
-                    else:
-                        self._log("LLM appears to be concluding WITHOUT validation - prompting to validate first")
-                        self.conversation_history.append(
-                            LLMMessage(
-                                role="user",
-                                content="You need to validate your SPARQL query with execute_query before concluding. Please test your query first."
-                            )
-                        )
+                # We should only prompt for answer if we have validated queries.
+                # A finished response is nudged by the completion check below.
+                if concluding and not finished:
+                    self._prompt_for_conclusion(
+                        state,
+                        "Please use the answer function to provide the final SPARQL query and answer.",
+                        llm_response.content
+                    )
             
             # Check for completion conditions
             # Only break if we have no function calls and the LLM seems to be concluding
-            if llm_response.finish_reason in ["stop", "length"] and not llm_response.function_calls:
+            if finished:
                 self._log(f"LLM finished with reason: {llm_response.finish_reason} with no function calls")
                 
-                has_validated_query = self._has_validated_query()
-                
-                if llm_response.content and self._is_concluding(llm_response.content):
-                    if has_validated_query:
-                        self._log("LLM appears to be concluding with validation - prompting for answer")
-                        self.conversation_history.append(
-                            LLMMessage(
-                                role="user",
-                                content="Please use the answer function to provide the final validated SPARQL query and answer."
-                            )
-                        )
-                    else:
-                        self._log("LLM appears to be concluding WITHOUT validation - prompting to validate")
-                        self.conversation_history.append(
-                            LLMMessage(
-                                role="user",
-                                content="You need to validate your SPARQL query with execute_query before concluding. Please test your query first."
-                            )
-                        )
+                if concluding:
+                    self._prompt_for_conclusion(
+                        state,
+                        "Please use the answer function to provide the final validated SPARQL query and answer.",
+                        llm_response.content
+                    )
                     continue
                 else:
                     # LLM stopped but didn't conclude - prompt it to continue
-                    self._continue_prompt_count += 1
-                    if self._continue_prompt_count >= self._max_continue_prompts:
-                        self._log(f"LLM stopped without concluding {self._continue_prompt_count} times - forcing timeout")
+                    state.continue_prompt_count += 1
+                    if state.continue_prompt_count >= self._max_continue_prompts:
+                        self._log(f"LLM stopped without concluding {state.continue_prompt_count} times - forcing timeout")
                         await self._emit("complete", {"status": "timeout"})
-                        return self._create_timeout_result()
+                        return self._create_timeout_result(state)
                     
                     self._log("LLM stopped without concluding - prompting to continue")
-                    self.conversation_history.append(
+                    state.conversation_history.append(
                         LLMMessage(
                             role="user",
                             content="No function called, if you have the query and tried it with execute_query, proceed with the answer function, otherwise keep using functions to come to a correct query."
@@ -353,32 +588,328 @@ Question: {question}
                     continue
         
         # If we reach here, we've exceeded iterations without answer/cancel
-        return self._create_timeout_result()
+        return self._create_timeout_result(state)
+    
+    async def _execute_function_call(self, state: RunState, function_call: FunctionCall) -> FunctionResult:
+        """Announce and execute a single function call through the registry."""
+        self._log(f"Executing function: {function_call.name} with args: {function_call.arguments}")
+        await self._emit("function_call", {
+            "iteration": state.iteration_count,
+            "function": function_call.name,
+            "arguments": function_call.arguments
+        })
+        key = self._call_key(function_call.name, function_call.arguments)
+        cached = state.tool_cache.get(key)
+        if cached is not None:
+            self._log(f"Reusing earlier result of {function_call.name}")
+            return cached
+        
+        speculation = state.speculations.pop(key, None)
+        if speculation is not None:
+            self._log(f"Using speculative result for {function_call.name}")
+            result = await speculation[1]
+        else:
+            result = await self.function_registry.execute_function(
+                function_call.name, function_call.arguments
+            )
+        
+        if result.success and function_call.name in self.CACHEABLE_FUNCTIONS:
+            state.tool_cache[key] = result
+        return result
+    
+    @staticmethod
+    def _call_key(function_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+        """Key identifying a function call by name and arguments."""
+        return function_name, json_dumps(arguments, sort_keys=True)
+    
+    def _speculate_query(self, state: RunState, content: str):
+        """Start executing the SPARQL block of an unvalidated answer ahead of time."""
+        match = _SPARQL_BLOCK_RE.search(content)
+        if not match or self.function_registry.get_function('execute_query') is None:
+            return
+        arguments = {"sparql": match.group(1).strip()}
+        key = self._call_key("execute_query", arguments)
+        if key in state.speculations:
+            return
+        self._log("Speculatively executing the proposed query")
+        task = asyncio.create_task(
+            self.function_registry.execute_function("execute_query", arguments)
+        )
+        state.speculations[key] = (state.iteration_count, task)
+    
+    def _cancel_speculations(self, state: RunState, before_iteration: Optional[int] = None):
+        """Cancel unused speculative calls (those started before an iteration, or all)."""
+        for key, (iteration, task) in list(state.speculations.items()):
+            if before_iteration is None or iteration < before_iteration:
+                task.cancel()
+                del state.speculations[key]
+    
+    def _early_dispatcher(
+        self,
+        state: RunState,
+        started: Dict[int, Tuple[Tuple[str, str], asyncio.Task]]
+    ) -> Callable[[FunctionCall], None]:
+        """Create a callback that starts streamed function calls right away."""
+        position = 0
+        terminal_seen = False
+        
+        def dispatch(function_call: FunctionCall):
+            nonlocal position, terminal_seen
+            index = position
+            position += 1
+            if terminal_seen:
+                return
+            if function_call.name in self.TERMINAL_FUNCTIONS:
+                # Terminal calls run in order; nothing after them is started
+                terminal_seen = True
+                return
+            started[index] = (
+                self._call_key(function_call.name, function_call.arguments),
+                asyncio.create_task(self._execute_function_call(state, function_call))
+            )
+        
+        return dispatch
+    
+    def _take_started(
+        self,
+        started: Dict[int, Tuple[Tuple[str, str], asyncio.Task]],
+        index: int,
+        function_call: FunctionCall
+    ) -> Optional[asyncio.Task]:
+        """Take the task started during streaming for a call, if it matches."""
+        entry = started.get(index)
+        if entry is None or entry[0] != self._call_key(function_call.name, function_call.arguments):
+            return None
+        del started[index]
+        return entry[1]
+    
+    @staticmethod
+    def _cancel_started(started: Dict[int, Tuple[Tuple[str, str], asyncio.Task]]):
+        """Cancel tasks started during streaming that were not used."""
+        for _, task in started.values():
+            task.cancel()
+        started.clear()
     
-    def _has_validated_query(self) -> bool:
-        """Check if any execute_query has succeeded in this session."""
-        return any(
-            f['function'] == 'execute_query' and f['success'] 
-            for f in self.function_results
+    async def _record_function_result(
+        self,
+        state: RunState,
+        function_call: FunctionCall,
+        result: FunctionResult,
+        future_id: Optional[str] = None
+    ):
+        """Record a function result and add it to the conversation history."""
+        function_name = function_call.name
+        state.function_results.append(FunctionCallRecord(
+            iteration=state.iteration_count,
+            function=function_name,
+            arguments=function_call.arguments,
+            result=result.result if result.success else None,
+            error=result.error if not result.success else None,
+            success=result.success
+        ))
+        state.function_counts[function_name] += 1
+        if result.success:
+            state.success_count += 1
+            if function_name == 'execute_query':
+                state.has_validated_query = True
+        else:
+            state.fail_count += 1
+        
+        await self._emit("function_result", {
+            "iteration": state.iteration_count,
+            "function": function_name,
+            "success": result.success,
+            "result": result.result if result.success else None,
+            "error": result.error if not result.success else None
+        })
+        
+        result_message = self._format_function_result_for_message(function_name, result)
+        
+        if future_id is not None:
+            # The function message slot was already used by the placeholder
+            state.conversation_history.append(
+                LLMMessage(
+                    role="user",
+                    content=f"Result of <future:{future_id}>: {result_message}"
+                )
+            )
+            return
+        
+        # Use tool_call_id if available (for OpenAI tools API)
+        message_name = function_name
+        if function_call.tool_call_id:
+            message_name = function_call.tool_call_id
+        
+        state.function_messages.append(
+            (len(state.conversation_history), self._summarize_function_result(function_name, result))
+        )
+        state.conversation_history.append(
+            LLMMessage(
+                role="function",
+                name=message_name,
+                content=result_message
+            )
         )
+        self._elide_function_messages(state)
+    
+    def _summarize_function_result(self, function_name: str, result: FunctionResult) -> str:
+        """Create the short stand-in for a function result that left the history window."""
+        if not result.success:
+            return f"<elided: {function_name} failed: {result.error}>"
+        data = result.result
+        if isinstance(data, dict):
+            rows = data.get('count')
+            if rows is None and isinstance(data.get('results'), list):
+                rows = len(data['results'])
+            if rows is not None:
+                return f"<elided: {function_name} returned {rows} rows>"
+        return f"<elided: {function_name} succeeded>"
+    
+    def _elide_function_messages(self, state: RunState):
+        """Replace function results older than the history window with summaries."""
+        if self.history_window is None:
+            return
+        excess = len(state.function_messages) - max(0, self.history_window)
+        if excess <= 0:
+            return
+        for index, summary in state.function_messages[:excess]:
+            message = state.conversation_history[index]
+            state.conversation_history[index] = LLMMessage(
+                role=message.role,
+                name=message.name,
+                content=summary
+            )
+        del state.function_messages[:excess]
+    
+    async def _dispatch_futures(self, state: RunState, function_calls: List[FunctionCall]) -> List[FunctionCall]:
+        """
+        Start non-terminal function calls in the background.
+        
+        Each started call is answered with a <future:ID> placeholder message.
+        Calls that reference a still pending future are not executed: the
+        referenced futures are awaited and the LLM is asked to call again with
+        the concrete values.
+        
+        Returns:
+            The function calls that must be executed right away (answer/cancel)
+        """
+        immediate = []
+        for function_call in function_calls:
+            message_name = function_call.tool_call_id or function_call.name
+            
+            if function_call.name in self.TERMINAL_FUNCTIONS:
+                immediate.append(function_call)
+                continue
+            
+            pending = [
+                future_id
+                for future_id in _FUTURE_RE.findall(json_dumps(function_call.arguments))
+                if future_id in state.futures
+            ]
+            if pending:
+                await self._resolve_futures(state, pending)
+                state.conversation_history.append(
+                    LLMMessage(
+                        role="function",
+                        name=message_name,
+                        content=(
+                            f"Function {function_call.name} was not executed: it referenced "
+                            f"pending results ({', '.join(pending)}) which are now available. "
+                            f"Call it again with the concrete values."
+                        )
+                    )
+                )
+                continue
+            
+            future_id = uuid.uuid4().hex[:8]
+            state.futures[future_id] = asyncio.create_task(
+                self._execute_function_call(state, function_call)
+            )
+            state.future_calls[future_id] = function_call
+            state.conversation_history.append(
+                LLMMessage(
+                    role="function",
+                    name=message_name,
+                    content=(
+                        f"Function {function_call.name} is running, its result will be "
+                        f"provided as <future:{future_id}>."
+                    )
+                )
+            )
+        return immediate
+    
+    async def _resolve_futures(self, state: RunState, future_ids: Optional[List[str]] = None, wait: bool = True):
+        """
+        Record the results of placeholder function calls.
+        
+        Args:
+            future_ids: Futures to resolve (default: all pending futures)
+            wait: Whether to wait for unfinished futures or only take the done ones
+        """
+        if future_ids is None:
+            future_ids = list(state.futures)
+        if not wait:
+            future_ids = [fid for fid in future_ids if state.futures[fid].done()]
+        
+        for future_id in future_ids:
+            task = state.futures.pop(future_id)
+            function_call = state.future_calls.pop(future_id)
+            try:
+                result = await task
+            except Exception as e:
+                result = FunctionResult(
+                    success=False,
+                    error=f"Function execution failed: {str(e)}"
+                )
+            await self._record_function_result(state, function_call, result, future_id=future_id)
+    
+    def _cancel_futures(self, state: RunState):
+        """Cancel placeholder function calls that are still running."""
+        for task in state.futures.values():
+            task.cancel()
+        state.futures.clear()
+        state.future_calls.clear()
+    
+    def _prompt_for_conclusion(self, state: RunState, answer_prompt: str, response_content: str):
+        """Ask a concluding LLM to answer, or to validate its query first."""
+        if state.has_validated_query:
+            self._log("LLM appears to be concluding with validated query - prompting for answer function")
+            content = answer_prompt
+        else:
+            self._log("LLM appears to be concluding WITHOUT validation - prompting to validate first")
+            content = "You need to validate your SPARQL query with execute_query before concluding. Please test your query first."
+            if self.speculative_execution:
+                self._speculate_query(state, response_content)
+        state.conversation_history.append(LLMMessage(role="user", content=content))
     
     def _is_concluding(self, content: str) -> bool:
         """Check if the LLM response appears to be concluding."""
-        content_lower = content.lower()
-        return any(keyword in content_lower for keyword in self.CONCLUDING_KEYWORDS)
+        return _CONCLUDE_RE.search(content) is not None
     
-    async def _get_llm_response(self) -> Optional[LLMResponse]:
+    async def _get_llm_response(
+        self,
+        state: RunState,
+        on_function_call: Optional[Callable[[FunctionCall], None]] = None
+    ) -> Optional[LLMResponse]:
         """Get response from LLM with function calling."""
         try:
-            # Get function definitions
-            functions = self.function_registry.get_function_definitions()
+            # Get function definitions (cached until the registry changes)
+            functions = self._function_definitions()
             
             # Call LLM with function calling
-            response = await self.llm.generate(
-                messages=self.conversation_history,
-                functions=functions,
-                function_call="auto"
-            )
+            if on_function_call is not None:
+                response = await self.llm.generate_stream(
+                    messages=state.conversation_history,
+                    functions=functions,
+                    function_call="auto",
+                    on_function_call=on_function_call
+                )
+            else:
+                response = await self.llm.generate(
+                    messages=state.conversation_history,
+                    functions=functions,
+                    function_call="auto"
+                )
             
             return response
             
@@ -386,56 +917,59 @@ Question: {question}
             self._log(f"Error getting LLM response: {e}")
             return None
     
-    def _process_answer_result(self, result: FunctionResult) -> Dict[str, Any]:
+    def _with_history(self, state: RunState, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the serialized conversation history to a result if enabled."""
+        if self.include_history:
+            result['conversation_history'] = [
+                msg.model_dump(mode="json", exclude_none=True)
+                for msg in state.conversation_history
+            ]
+        return result
+    
+    def _process_answer_result(self, state: RunState, result: FunctionResult) -> Dict[str, Any]:
         """Process result from answer function."""
         if result.success:
-            return {
+            return self._with_history(state, {
                 'status': 'success',
                 'result': result.result,
-                'iterations': self.iteration_count,
-                'function_calls': self.function_results,
-                'conversation_history': [
-                    msg.dict() for msg in self.conversation_history
-                ]
-            }
+                'iterations': state.iteration_count,
+                'function_calls': [record.to_dict() for record in state.function_results]
+            })
         else:
             return {
                 'status': 'error',
                 'error': f"Answer function failed: {result.error}",
-                'iterations': self.iteration_count,
-                'function_calls': self.function_results
+                'iterations': state.iteration_count,
+                'function_calls': [record.to_dict() for record in state.function_results]
             }
     
-    def _process_cancel_result(self, result: FunctionResult) -> Dict[str, Any]:
+    def _process_cancel_result(self, state: RunState, result: FunctionResult) -> Dict[str, Any]:
         """Process result from cancel function."""
         if result.success:
-            return {
+            return self._with_history(state, {
                 'status': 'cancelled',
                 'result': result.result,
-                'iterations': self.iteration_count,
-                'function_calls': self.function_results,
-                'conversation_history': [
-                    msg.dict() for msg in self.conversation_history
-                ]
-            }
+                'iterations': state.iteration_count,
+                'function_calls': [record.to_dict() for record in state.function_results]
+            })
         else:
             return {
                 'status': 'error',
                 'error': f"Cancel function failed: {result.error}",
-                'iterations': self.iteration_count,
-                'function_calls': self.function_results
+                'iterations': state.iteration_count,
+                'function_calls': [record.to_dict() for record in state.function_results]
             }
     
-    def _create_error_result(self, error: str) -> Dict[str, Any]:
+    def _create_error_result(self, state: RunState, error: str) -> Dict[str, Any]:
         """Create error result."""
         return {
             'status': 'error',
             'error': error,
-            'iterations': self.iteration_count,
-            'function_calls': self.function_results
+            'iterations': state.iteration_count,
+            'function_calls': [record.to_dict() for record in state.function_results]
         }
     
-    def _create_timeout_result(self) -> Dict[str, Any]:
+    def _create_timeout_result(self, state: RunState) -> Dict[str, Any]:
         """Create timeout result with best possible attempt."""
         # Analyze conversation history to find the best attempt
         best_attempt = None
@@ -443,50 +977,41 @@ Question: {question}
         best_answer = None
         
         # Look for answer function calls in the results
-        for func_call in self.function_results:
-            if func_call['function'] == 'answer' and func_call['success']:
-                best_attempt = func_call['result']
+        for func_call in state.function_results:
+            if func_call.function == 'answer' and func_call.success:
+                best_attempt = func_call.result
                 if best_attempt:
                     best_sparql = best_attempt.get('sparql')
                     best_answer = best_attempt.get('answer')
                 break
         
-        # If no answer function was called, look for SPARQL queries in conversation
+        # If no answer function was called, look for the most recent SPARQL
+        # query in the conversation
         if not best_attempt:
-            for msg in self.conversation_history:
+            for msg in reversed(state.conversation_history):
                 if msg.role == 'assistant' and msg.content:
-                    # Try to extract SPARQL query from assistant messages
                     content = msg.content
-                    # Look for SPARQL patterns
-                    import re
-                    sparql_patterns = [
-                        r'SELECT.*WHERE.*\{.*\}',
-                        r'PREFIX.*SELECT',
-                        r'CONSTRUCT.*WHERE.*\{.*\}',
-                        r'ASK.*WHERE.*\{.*\}'
-                    ]
-                    
-                    for pattern in sparql_patterns:
-                        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-                        if match:
-                            best_sparql = match.group(0).strip()
-                            # Try to extract answer from surrounding text
-                            lines = content.split('\n')
-                            for i, line in enumerate(lines):
-                                if 'answer' in line.lower() or 'is' in line.lower():
-                                    if i + 1 < len(lines):
-                                        best_answer = lines[i + 1].strip()
-                                    break
-                            break
+                    match = _SPARQL_RE.search(content)
+                    if match:
+                        best_sparql = match.group(0).strip()
+                        # Try to extract answer from surrounding text
+                        lines = content.split('\n')
+                        for i, line in enumerate(lines):
+                            line_lower = line.lower()
+                            if 'answer' in line_lower or 'is' in line_lower:
+                                if i + 1 < len(lines):
+                                    best_answer = lines[i + 1].strip()
+                                break
+                        break
         
         # Also check for any execute_query calls that might have results
         if not best_attempt:
-            for func_call in self.function_results:
-                if func_call['function'] == 'execute_query' and func_call['success']:
-                    result_data = func_call.get('result', {})
+            for func_call in state.function_results:
+                if func_call.function == 'execute_query' and func_call.success:
+                    result_data = func_call.result or {}
                     if result_data.get('results'):
                         best_attempt = {
-                            'sparql': func_call.get('arguments', {}).get('query', 'Unknown query'),
+                            'sparql': (func_call.arguments or {}).get('query', 'Unknown query'),
                             'results': result_data.get('results', []),
                             'count': result_data.get('count', 0)
                         }
@@ -504,12 +1029,10 @@ Question: {question}
         timeout_result = {
             'status': 'timeout',
             'error': f"Exceeded maximum iterations ({self.max_iterations})",
-            'iterations': self.iteration_count,
-            'function_calls': self.function_results,
-            'conversation_history': [
-                msg.dict() for msg in self.conversation_history
-            ]
+            'iterations': state.iteration_count,
+            'function_calls': [record.to_dict() for record in state.function_results]
         }
+        self._with_history(state, timeout_result)
         
         # Add best attempt if found
         if best_attempt:
@@ -521,18 +1044,13 @@ Question: {question}
         
         return timeout_result
     
-    def get_execution_summary(self) -> Dict[str, Any]:
-        """Get summary of execution."""
-        successful_calls = [f for f in self.function_results if f['success']]
-        failed_calls = [f for f in self.function_results if not f['success']]
-        
+    def get_execution_summary(self, state: Optional[RunState] = None) -> Dict[str, Any]:
+        """Get summary of execution (of the most recent process_question() run by default)."""
+        state = state or self._state
         return {
-            'total_iterations': self.iteration_count,
-            'total_function_calls': len(self.function_results),
-            'successful_function_calls': len(successful_calls),
-            'failed_function_calls': len(failed_calls),
-            'function_call_breakdown': {
-                func_name: len([f for f in self.function_results if f['function'] == func_name])
-                for func_name in set(f['function'] for f in self.function_results)
-            }
+            'total_iterations': state.iteration_count,
+            'total_function_calls': len(state.function_results),
+            'successful_function_calls': state.success_count,
+            'failed_function_calls': state.fail_count,
+            'function_call_breakdown': dict(state.function_counts)
         }
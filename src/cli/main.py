@@ -2,42 +2,71 @@
 
 import asyncio
 import os
-from typing import Optional
+from typing import List, Optional
 import click
-import yaml
-from dotenv import load_dotenv
 
-from ..llm.openai_client import OpenAIClient
-from ..llm.ollama_client import OllamaClient
-from ..sparql.qlever_client import QLeverClient
+from .. import __version__
+from ..utils.config import (
+    CONFIG_PATH,
+    OPENAI_COMPATIBLE_PROVIDERS,
+    PROVIDER_API_KEY_ENV,
+    ResolvedConfig,
+    load_resolved_config,
+)
 
-
-# Load environment variables
-load_dotenv()
+# LLM and SPARQL clients (and their SDKs) are imported inside the commands
+# that use them, so that --help, --version and 'endpoints list' start fast.
 
 
 @click.group()
-@click.version_option(package_name="nltosparql")
-def cli():
+# An explicit version avoids an importlib.metadata scan on every start
+@click.version_option(version=__version__)
+@click.pass_context
+def cli(ctx: click.Context):
     """NLtoSPARQL: Generate SPARQL queries from natural language using LLMs."""
-    pass
+    # Load environment variables (only once a command actually runs)
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Resolve the configuration once for whichever subcommand runs
+    ctx.ensure_object(dict)
+    ctx.obj['config'] = _load_config()
 
 
-def _load_config() -> dict:
-    """Load configuration from YAML file."""
-    config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
+# Supported LLM providers, as offered by the --provider options
+_PROVIDERS = ('ollama', 'openrouter')
+
+# Display names of the providers in status messages
+_PROVIDER_LABELS = {'ollama': 'Ollama', 'openrouter': 'OpenRouter'}
+
+def _run(coro):
+    """Run a coroutine to completion, on uvloop when it is installed."""
+    async def main():
+        from ..sparql.qlever_client import close_shared_clients
+        try:
+            return await coro
+        finally:
+            await close_shared_clients()
+    
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        click.echo(f"Warning: Config file not found at {config_path}", err=True)
-        return {}
+        import uvloop
+    except ImportError:
+        return asyncio.run(main())
+    return uvloop.run(main())
+
+
+def _load_config() -> ResolvedConfig:
+    """Load configuration from YAML file."""
+    if not os.path.isfile(CONFIG_PATH):
+        click.echo(f"Warning: Config file not found at {CONFIG_PATH}", err=True)
+        return ResolvedConfig()
+    return load_resolved_config()
 
 
 @cli.command()
 @click.argument('question')
 @click.option('--provider', '-p', default='ollama', 
-              type=click.Choice(['ollama', 'openrouter']),
+              type=click.Choice(_PROVIDERS),
               help='LLM provider to use (ollama or openrouter)')
 @click.option('--endpoint', '-e', default='wikidata',
               help='Endpoint to use (e.g., wikidata, dblp, dbpedia)')
@@ -47,29 +76,27 @@ def _load_config() -> dict:
               help='Enable verbose output')
 @click.option('--ontology', '-o', 'ontologies', multiple=True,
               help='Path to ontology file(s) in Turtle format (relative to /ontologies)')
-def query(question: str, provider: str, endpoint: str, model: Optional[str], verbose: bool, ontologies: tuple):
+@click.pass_context
+def query(ctx: click.Context, question: str, provider: str, endpoint: str, model: Optional[str], verbose: bool, ontologies: tuple):
     """Generate a SPARQL query for a natural language question."""
-    config = _load_config()
+    config: ResolvedConfig = ctx.obj['config']
     
     # Get endpoint URL
-    endpoints = config.get('endpoints', {})
+    endpoints = config.endpoints
     endpoint_url = endpoints.get(endpoint)
     if not endpoint_url:
         click.echo(f"Error: Unknown endpoint '{endpoint}'. Available: {', '.join(endpoints.keys())}", err=True)
         return
     
     # Get LLM configuration
-    llm_config = config.get('llm', {}) or {}
-    models_config = llm_config.get('models', {}) or {}
-    
-    if provider not in models_config:
+    provider_config = config.providers.get(provider)
+    if provider_config is None:
         click.echo(f"Error: No configuration found for provider '{provider}'", err=True)
         return
     
-    provider_config = models_config.get(provider, {}) or {}
-    model_name = model or provider_config.get('model', '')
-    temperature = provider_config.get('temperature', 0.1)
-    max_tokens = provider_config.get('max_tokens', 4096)
+    model_name = model or provider_config.model
+    temperature = provider_config.temperature
+    max_tokens = provider_config.max_tokens
     
     if verbose:
         click.echo(f"Using provider: {provider}")
@@ -79,16 +106,18 @@ def query(question: str, provider: str, endpoint: str, model: Optional[str], ver
     
     # Initialize LLM client
     llm_client = None
-    if provider == 'openrouter':
+    if provider in OPENAI_COMPATIBLE_PROVIDERS:
         # For OpenRouter (OpenAI-compatible API)
-        api_key = os.getenv('OPENROUTER_API_KEY')
+        env_var_name = PROVIDER_API_KEY_ENV[provider]
+        api_key = os.getenv(env_var_name)
         if not api_key:
-            click.echo(f"Error: OPENROUTER_API_KEY environment variable not set", err=True)
+            click.echo(f"Error: {env_var_name} environment variable not set", err=True)
             return
         
         # Get base URL from config if specified
-        base_url = provider_config.get('base_url')
+        base_url = provider_config.base_url
         
+        from ..llm.openai_client import OpenAIClient
         llm_client = OpenAIClient(
             model=model_name,
             temperature=temperature,
@@ -97,28 +126,35 @@ def query(question: str, provider: str, endpoint: str, model: Optional[str], ver
             base_url=base_url
         )
     elif provider == 'ollama':
+        from ..llm.ollama_client import OllamaClient
         llm_client = OllamaClient(
             model=model_name,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            keep_alive=provider_config.keep_alive
         )
     else:
         click.echo(f"Error: Provider '{provider}' not yet implemented", err=True)
         return
     
-    # Initialize QLever client
-    qlever_client = QLeverClient(endpoint_url)
+    async def run():
+        from ..sparql.qlever_client import get_shared_client
+        
+        # All async work of the command runs on one event loop, and the
+        # QLever client is the one the agent functions use; _run() closes it
+        qlever_client = await get_shared_client(endpoint_url)
+        await run_query_generation(
+            question=question,
+            llm_client=llm_client,
+            qlever_client=qlever_client,
+            verbose=verbose,
+            provider=provider,
+            endpoint=endpoint,
+            ontologies=ontologies
+        )
     
     # Run the query generation
-    asyncio.run(run_query_generation(
-        question=question,
-        llm_client=llm_client,
-        qlever_client=qlever_client,
-        verbose=verbose,
-        provider=provider,
-        endpoint=endpoint,
-        ontologies=ontologies
-    ))
+    _run(run())
 
 
 async def run_query_generation(question: str, llm_client, qlever_client, verbose: bool, provider: str, endpoint: str, ontologies: tuple = ()):
@@ -134,97 +170,103 @@ async def run_query_generation(question: str, llm_client, qlever_client, verbose
             provider=provider,
             verbose=verbose,
             kg_name=endpoint,
-            ontologies=list(ontologies) if ontologies else None
+            ontologies=list(ontologies) if ontologies else None,
+            llm=llm_client
         )
         
         # Process question
         result = await agent.process_question(question, kg_name=endpoint)
         
+        # Collect the report and write it at once instead of line by line
+        out: List[str] = []
+        
         # Display results based on status
         if result['status'] == 'success':
-            click.echo("\n" + "=" * 60)
-            click.echo("SUCCESS: SPARQL query generated")
-            click.echo("=" * 60)
+            out.append("\n" + "=" * 60)
+            out.append("SUCCESS: SPARQL query generated")
+            out.append("=" * 60)
             
             result_data = result['result']
-            click.echo(f"\nKnowledge Graph: {result_data.get('knowledge_graph', 'N/A')}")
-            click.echo(f"\nSPARQL Query:")
-            click.echo("-" * 40)
-            click.echo(result_data.get('sparql_query', 'N/A'))
-            click.echo("-" * 40)
+            out.append(f"\nKnowledge Graph: {result_data.get('knowledge_graph', 'N/A')}")
+            out.append(f"\nSPARQL Query:")
+            out.append("-" * 40)
+            out.append(result_data.get('sparql_query', 'N/A'))
+            out.append("-" * 40)
             
             if result_data.get('answer'):
-                click.echo(f"\nAnswer: {result_data.get('answer')}")
+                out.append(f"\nAnswer: {result_data.get('answer')}")
             
             if result_data.get('explanation'):
-                click.echo(f"\nExplanation: {result_data.get('explanation')}")
+                out.append(f"\nExplanation: {result_data.get('explanation')}")
             
             # Show execution summary
             summary = agent.get_execution_summary()
-            click.echo(f"\nExecution Summary:")
-            click.echo(f"  Iterations: {summary['total_iterations']}")
-            click.echo(f"  Function calls: {summary['total_function_calls']}")
-            click.echo(f"  Successful: {summary['successful_function_calls']}")
-            click.echo(f"  Failed: {summary['failed_function_calls']}")
+            out.append(f"\nExecution Summary:")
+            out.append(f"  Iterations: {summary['total_iterations']}")
+            out.append(f"  Function calls: {summary['total_function_calls']}")
+            out.append(f"  Successful: {summary['successful_function_calls']}")
+            out.append(f"  Failed: {summary['failed_function_calls']}")
             
             if verbose:
-                click.echo(f"\nFunction call breakdown:")
+                out.append(f"\nFunction call breakdown:")
                 for func_name, count in summary['function_call_breakdown'].items():
-                    click.echo(f"  {func_name}: {count}")
+                    out.append(f"  {func_name}: {count}")
         
         elif result['status'] == 'cancelled':
-            click.echo("\n" + "=" * 60)
-            click.echo("CANCELLED: Could not generate satisfactory query")
-            click.echo("=" * 60)
+            out.append("\n" + "=" * 60)
+            out.append("CANCELLED: Could not generate satisfactory query")
+            out.append("=" * 60)
             
             result_data = result['result']
-            click.echo(f"\nExplanation: {result_data.get('explanation', 'N/A')}")
+            out.append(f"\nExplanation: {result_data.get('explanation', 'N/A')}")
             
             if result_data.get('best_attempt'):
-                click.echo(f"\nBest attempt:")
-                click.echo("-" * 40)
-                click.echo(str(result_data.get('best_attempt')))
-                click.echo("-" * 40)
+                out.append(f"\nBest attempt:")
+                out.append("-" * 40)
+                out.append(str(result_data.get('best_attempt')))
+                out.append("-" * 40)
         
         elif result['status'] == 'timeout':
-            click.echo("\n" + "=" * 60)
-            click.echo("TIMEOUT: Exceeded maximum iterations")
-            click.echo("=" * 60)
-            click.echo(f"\nError: {result.get('error', 'Unknown error')}")
+            out.append("\n" + "=" * 60)
+            out.append("TIMEOUT: Exceeded maximum iterations")
+            out.append("=" * 60)
+            out.append(f"\nError: {result.get('error', 'Unknown error')}")
             
             summary = agent.get_execution_summary()
-            click.echo(f"\nProgress before timeout:")
-            click.echo(f"  Iterations: {summary['total_iterations']}")
-            click.echo(f"  Function calls: {summary['total_function_calls']}")
+            out.append(f"\nProgress before timeout:")
+            out.append(f"  Iterations: {summary['total_iterations']}")
+            out.append(f"  Function calls: {summary['total_function_calls']}")
             
             # Show best attempt if available
             if result.get('best_attempt'):
-                click.echo(f"\nBest attempt found:")
-                click.echo("-" * 40)
+                out.append(f"\nBest attempt found:")
+                out.append("-" * 40)
                 
                 if result.get('best_sparql'):
-                    click.echo(f"SPARQL Query:")
-                    click.echo(result['best_sparql'])
-                    click.echo()
+                    out.append(f"SPARQL Query:")
+                    out.append(result['best_sparql'])
+                    out.append("")
                 
                 if result.get('best_answer'):
-                    click.echo(f"Answer: {result['best_answer']}")
-                    click.echo()
+                    out.append(f"Answer: {result['best_answer']}")
+                    out.append("")
                 
                 # Show the full best attempt object if verbose
                 if verbose:
-                    click.echo(f"Full best attempt data:")
-                    click.echo(str(result['best_attempt']))
+                    out.append(f"Full best attempt data:")
+                    out.append(str(result['best_attempt']))
                 
-                click.echo("-" * 40)
+                out.append("-" * 40)
             else:
-                click.echo(f"\nNo complete query or answer found in attempts.")
+                out.append(f"\nNo complete query or answer found in attempts.")
         
         elif result['status'] == 'error':
-            click.echo("\n" + "=" * 60)
-            click.echo("ERROR: Failed to generate query")
-            click.echo("=" * 60)
-            click.echo(f"\nError: {result.get('error', 'Unknown error')}")
+            out.append("\n" + "=" * 60)
+            out.append("ERROR: Failed to generate query")
+            out.append("=" * 60)
+            out.append(f"\nError: {result.get('error', 'Unknown error')}")
+        
+        click.echo("\n".join(out))
         
         # Test the QLever connection if verbose
         if verbose:
@@ -237,11 +279,11 @@ async def run_query_generation(question: str, llm_client, qlever_client, verbose
                 click.echo("Failed to connect to QLever endpoint")
     
     except Exception as e:
-        click.echo(f"\nError during query generation: {e}")
+        message = f"\nError during query generation: {e}"
         if verbose:
             import traceback
-            click.echo(f"\nTraceback:")
-            click.echo(traceback.format_exc())
+            message += f"\n\nTraceback:\n{traceback.format_exc()}"
+        click.echo(message)
 
 
 @cli.group()
@@ -251,10 +293,11 @@ def endpoints():
 
 
 @endpoints.command('list')
-def endpoints_list():
+@click.pass_context
+def endpoints_list(ctx: click.Context):
     """List available QLever endpoints."""
-    config = _load_config()
-    endpoints = config.get('endpoints', {})
+    config: ResolvedConfig = ctx.obj['config']
+    endpoints = config.endpoints
     
     click.echo("Available QLever endpoints:")
     for name, url in endpoints.items():
@@ -264,10 +307,11 @@ def endpoints_list():
 @endpoints.command('test')
 @click.option('--endpoint', '-e', default='wikidata',
               help='Endpoint to test')
-def endpoints_test(endpoint: str):
+@click.pass_context
+def endpoints_test(ctx: click.Context, endpoint: str):
     """Test connection to a QLever endpoint."""
-    config = _load_config()
-    endpoints = config.get('endpoints', {}) or {}
+    config: ResolvedConfig = ctx.obj['config']
+    endpoints = config.endpoints
     
     endpoint_url = endpoints.get(endpoint)
     if not endpoint_url:
@@ -277,95 +321,98 @@ def endpoints_test(endpoint: str):
     click.echo(f"Testing connection to {endpoint} ({endpoint_url})...")
     
     async def test():
-        async with QLeverClient(endpoint_url) as client:
-            connected = await client.test_connection()
-            if connected:
-                click.echo("Connection successful")
-                # Get endpoint info
-                info = await client.get_endpoint_info()
-                if info:
-                    triple_count = info.get('triple_count', 'unknown')
-                    subject_count = info.get('subject_count', 'unknown')
-                    predicate_count = info.get('predicate_count', 'unknown')
-                    click.echo(f"  Triple count: {triple_count}")
-                    click.echo(f"  Subject count: {subject_count}")
-                    click.echo(f"  Predicate count: {predicate_count}")
-                else:
-                    click.echo("  Could not retrieve endpoint information")
+        from ..sparql.qlever_client import get_shared_client
+        
+        client = await get_shared_client(endpoint_url)
+        # Connection check and endpoint info are independent requests
+        connected, info = await asyncio.gather(
+            client.test_connection(),
+            client.get_endpoint_info(),
+            return_exceptions=True
+        )
+        if connected is True:
+            click.echo("Connection successful")
+            if info and not isinstance(info, BaseException):
+                triple_count = info.get('triple_count', 'unknown')
+                subject_count = info.get('subject_count', 'unknown')
+                predicate_count = info.get('predicate_count', 'unknown')
+                click.echo(f"  Triple count: {triple_count}")
+                click.echo(f"  Subject count: {subject_count}")
+                click.echo(f"  Predicate count: {predicate_count}")
             else:
-                click.echo("Connection failed")
+                click.echo("  Could not retrieve endpoint information")
+        else:
+            click.echo("Connection failed")
     
-    asyncio.run(test())
+    _run(test())
 
 
 @cli.command()
-@click.option('--provider', '-p', default='ollama',
-              type=click.Choice(['ollama', 'openrouter']),
-              help='LLM provider to test (ollama or openrouter)')
-def test(provider: str):
+@click.option('--provider', '-p', 'providers', multiple=True, default=('ollama',),
+              type=click.Choice(_PROVIDERS),
+              help='LLM provider to test (ollama or openrouter); repeat to test several')
+@click.pass_context
+def test(ctx: click.Context, providers: tuple):
     """Test LLM provider connection."""
-    config = _load_config()
-    llm_config = config.get('llm', {})
-    if not llm_config:
-        llm_config = {}
+    config: ResolvedConfig = ctx.obj['config']
     
-    models_config = llm_config.get('models', {})
-    if not models_config:
-        models_config = {}
+    # Check the configuration of every provider before contacting any of them
+    probes = []
+    for provider in dict.fromkeys(providers):
+        provider_config = config.providers.get(provider)
+        if provider_config is None:
+            click.echo(f"Error: No configuration found for provider '{provider}'", err=True)
+            continue
+        
+        api_key = None
+        if provider in OPENAI_COMPATIBLE_PROVIDERS:
+            env_var_name = PROVIDER_API_KEY_ENV[provider]
+            api_key = os.getenv(env_var_name)
+            if not api_key:
+                click.echo(f"Error: {env_var_name} environment variable not set", err=True)
+                continue
+        elif provider != 'ollama':
+            click.echo(f"Error: Provider '{provider}' not yet implemented", err=True)
+            continue
+        
+        click.echo(f"Testing {provider} connection with model '{provider_config.model}'...")
+        probes.append((provider, provider_config, api_key))
     
-    if provider not in models_config:
-        click.echo(f"Error: No configuration found for provider '{provider}'", err=True)
+    if not probes:
         return
     
-    provider_config = models_config.get(provider, {})
-    if not provider_config:
-        provider_config = {}
-    
-    model_name = provider_config.get('model', '')
-    
-    click.echo(f"Testing {provider} connection with model '{model_name}'...")
-    
-    if provider == 'openrouter':
-        api_key = os.getenv('OPENROUTER_API_KEY')
-        if not api_key:
-            click.echo(f"Error: OPENROUTER_API_KEY environment variable not set", err=True)
-            return
-        
-        async def test_openrouter():
-            try:
-                base_url = provider_config.get('base_url')
-                client = OpenAIClient(
-                    model=model_name,
-                    api_key=api_key,
-                    base_url=base_url if base_url else None
-                )
-                # Simple test message
-                from ..llm.base import LLMMessage
-                messages = [LLMMessage(role="user", content="Hello, are you working?")]
-                response = await client.generate(messages)
-                click.echo(f"✓ OpenRouter connection successful")
-                click.echo(f"  Response: {response.content[:100]}...")
-            except Exception as e:
-                click.echo(f"✗ OpenRouter connection failed: {e}")
+    async def probe(provider: str, provider_config, api_key: Optional[str]):
+        from ..llm.base import LLMMessage
+        if provider in OPENAI_COMPATIBLE_PROVIDERS:
+            from ..llm.openai_client import OpenAIClient
+            client = OpenAIClient(
+                model=provider_config.model,
+                api_key=api_key,
+                base_url=provider_config.base_url or None
+            )
+        else:
+            from ..llm.ollama_client import OllamaClient
+            client = OllamaClient(model=provider_config.model)
         
-        asyncio.run(test_openrouter())
+        # Simple test message
+        messages = [LLMMessage(role="user", content="Hello, are you working?")]
+        return await client.generate(messages)
     
-    elif provider == 'ollama':
-        async def test_ollama():
-            try:
-                client = OllamaClient(model=model_name)
-                from ..llm.base import LLMMessage
-                messages = [LLMMessage(role="user", content="Hello, are you working?")]
-                response = await client.generate(messages)
-                click.echo(f"✓ Ollama connection successful")
-                click.echo(f"  Response: {response.content[:100]}...")
-            except Exception as e:
-                click.echo(f"✗ Ollama connection failed: {e}")
-        
-        asyncio.run(test_ollama())
+    async def run_probes():
+        # The providers are independent, so they are probed concurrently
+        results = await asyncio.gather(
+            *(probe(*args) for args in probes),
+            return_exceptions=True
+        )
+        for (provider, _, _), result in zip(probes, results):
+            label = _PROVIDER_LABELS.get(provider, provider)
+            if isinstance(result, Exception):
+                click.echo(f"✗ {label} connection failed: {result}")
+            else:
+                click.echo(f"✓ {label} connection successful")
+                click.echo(f"  Response: {result.content[:100]}...")
     
-    else:
-        click.echo(f"Error: Provider '{provider}' not yet implemented", err=True)
+    _run(run_probes())
 
 
 @cli.command()
@@ -376,10 +423,11 @@ def test(provider: str):
               help='Use EXPLAIN to validate query')
 @click.option('--format', 'format_query', is_flag=True,
               help='Format the query for better readability')
-def validate(query: str, endpoint: str, explain: bool, format_query: bool):
+@click.pass_context
+def validate(ctx: click.Context, query: str, endpoint: str, explain: bool, format_query: bool):
     """Validate a SPARQL query."""
-    config = _load_config()
-    endpoints = config.get('endpoints', {}) or {}
+    config: ResolvedConfig = ctx.obj['config']
+    endpoints = config.endpoints
     endpoint_url = endpoints.get(endpoint)
     
     if not endpoint_url:
@@ -387,8 +435,8 @@ def validate(query: str, endpoint: str, explain: bool, format_query: bool):
         return
     
     async def run_validation():
+        from src.sparql.qlever_client import get_shared_client
         from src.sparql.validator import QueryValidator
-        from src.sparql.qlever_client import QLeverClient
         
         # Format query if requested
         if format_query:
@@ -422,19 +470,19 @@ def validate(query: str, endpoint: str, explain: bool, format_query: bool):
         
         # Validate with endpoint
         click.echo(f"\nValidating with endpoint {endpoint}...")
-        async with QLeverClient(endpoint_url) as client:
-            is_valid, error, result = await QueryValidator.validate_with_endpoint(
-                client, query, explain
-            )
-            
-            if is_valid:
-                click.echo("Endpoint validation passed")
-                if explain and result:
-                    click.echo(f"\nEXPLAIN result: {result}")
-            else:
-                click.echo(f"Endpoint validation failed: {error}")
+        client = await get_shared_client(endpoint_url)
+        is_valid, error, result = await QueryValidator.validate_with_endpoint(
+            client, query, explain
+        )
+        
+        if is_valid:
+            click.echo("Endpoint validation passed")
+            if explain and result:
+                click.echo(f"\nEXPLAIN result: {result}")
+        else:
+            click.echo(f"Endpoint validation failed: {error}")
     
-    asyncio.run(run_validation())
+    _run(run_validation())
 
 
 def main():
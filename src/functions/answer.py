@@ -13,7 +13,7 @@ class AnswerFunction(BaseFunction):
             description="Provide the final SPARQL query and answer to the question"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -40,16 +40,20 @@ class AnswerFunction(BaseFunction):
         )
     
     async def execute(self, **kwargs) -> FunctionResult:
-        kg = kwargs.get("kg")
-        sparql = kwargs.get("sparql")
-        answer = kwargs.get("answer")
-        explanation = kwargs.get("explanation", "")
-        
-        if not sparql or not answer:
+        return self.sync_execute(**kwargs)
+    
+    def sync_execute(self, **kwargs) -> FunctionResult:
+        try:
+            sparql = kwargs["sparql"]
+            answer = kwargs["answer"]
+        except KeyError as e:
             return FunctionResult(
                 success=False,
-                error="Missing required parameters: sparql and answer"
+                error=f"Missing required parameter: {e.args[0]}"
             )
+        # kg is not an LLM parameter; the registry fills it in
+        kg = kwargs.get("kg")
+        explanation = kwargs.get("explanation", "")
         
         return FunctionResult(
             success=True,
@@ -72,7 +76,7 @@ class CancelFunction(BaseFunction):
             description="Cancel the generation process when no satisfactory SPARQL query can be found"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -93,14 +97,17 @@ class CancelFunction(BaseFunction):
         )
     
     async def execute(self, **kwargs) -> FunctionResult:
-        explanation = kwargs.get("explanation")
-        best_attempt = kwargs.get("best_attempt")
-        
-        if not explanation:
+        return self.sync_execute(**kwargs)
+    
+    def sync_execute(self, **kwargs) -> FunctionResult:
+        try:
+            explanation = kwargs["explanation"]
+        except KeyError:
             return FunctionResult(
                 success=False,
                 error="Missing required parameter: explanation"
             )
+        best_attempt = kwargs.get("best_attempt")
         
         result = {
             'status': 'cancelled',
@@ -1,56 +1,151 @@
 """Base classes for function calling system."""
 
+import json
+import sys
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
 
-class FunctionParameter(BaseModel):
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> str:
+    """
+    Serialize an object to compact JSON, using orjson when it is installed.
+    
+    Args:
+        obj: Object to serialize; unknown types are converted with str()
+        sort_keys: Whether to sort dictionary keys
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=str, option=option).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; the standard library handles them
+            pass
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, default=str)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON, using orjson when it is installed.
+    
+    Args:
+        data: JSON document
+        
+    Returns:
+        Parsed object
+        
+    Raises:
+        json.JSONDecodeError: If the document is invalid; orjson's error is a subclass
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def safe_int(value: Any, default: int = 0) -> int:
+    """
+    Convert a value, such as a count returned by an endpoint, to an integer.
+    
+    Args:
+        value: Value to convert
+        default: Value to return if the conversion fails
+        
+    Returns:
+        Converted integer or default
+    """
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+# Slotted dataclasses (Python 3.10+) have no per-instance __dict__, which makes
+# them smaller and their attributes faster to read; on older versions the
+# classes are regular dataclasses
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
+class FunctionParameter:
     """Parameter definition for a function."""
     
-    name: str = Field(..., description="Name of the parameter")
-    type: str = Field(..., description="Type of the parameter (string, integer, etc.)")
-    description: str = Field(..., description="Description of the parameter")
-    required: bool = Field(default=True, description="Whether the parameter is required")
+    name: str  # Name of the parameter
+    type: str  # Type of the parameter (string, integer, etc.)
+    description: str  # Description of the parameter
+    required: bool = True  # Whether the parameter is required
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Convert the parameter to a dictionary."""
+        return asdict(self)
 
 
-class FunctionDefinition(BaseModel):
-    """Definition of a function that can be called by the LLM."""
+@dataclass(frozen=True)
+class FunctionDefinition:
+    """
+    Definition of a function that can be called by the LLM.
+    
+    Unlike the parameter and result classes this one keeps its __dict__,
+    which the cached schema property is stored in.
+    """
     
-    name: str = Field(..., description="Name of the function")
-    description: str = Field(..., description="Description of what the function does")
-    parameters: List[FunctionParameter] = Field(default_factory=list, description="List of parameters")
+    name: str  # Name of the function
+    description: str  # Description of what the function does
+    parameters: List[FunctionParameter] = field(default_factory=list)  # List of parameters
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Convert the definition to a dictionary."""
+        return asdict(self)
+    
+    @cached_property
+    def schema(self) -> Dict[str, Any]:
+        """
+        Function definition in dictionary format for LLM, built once.
+        
+        The dictionary is shared between callers and must not be modified;
+        use to_dict() for a private copy.
+        """
+        return self.to_dict()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert function definition to dictionary format for LLM."""
-        properties = {}
-        required = []
-        
-        for param in self.parameters:
-            properties[param.name] = {
-                "type": param.type,
-                "description": param.description,
-            }
-            if param.required:
-                required.append(param.name)
-        
+        params = self.parameters
         return {
             "name": self.name,
             "description": self.description,
             "parameters": {
                 "type": "object",
-                "properties": properties,
-                "required": required,
+                "properties": {
+                    param.name: {"type": param.type, "description": param.description}
+                    for param in params
+                },
+                "required": [param.name for param in params if param.required],
             }
         }
 
 
-class FunctionResult(BaseModel):
+@dataclass(frozen=True, **_SLOTS)
+class FunctionResult:
     """Result of a function execution."""
     
-    success: bool = Field(..., description="Whether the function executed successfully")
-    result: Any = Field(default=None, description="Result of the function execution")
-    error: Optional[str] = Field(default=None, description="Error message if execution failed")
+    success: bool  # Whether the function executed successfully
+    result: Any = None  # Result of the function execution
+    error: Optional[str] = None  # Error message if execution failed
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Convert the result to a dictionary."""
+        return {"success": self.success, "result": self.result, "error": self.error}
 
 
 class BaseFunction(ABC):
@@ -59,6 +154,10 @@ class BaseFunction(ABC):
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
+        # Definition built on first use; definitions are static
+        self._definition: Optional[FunctionDefinition] = None
+        # Names of required parameters, resolved on first validation
+        self._required_params: Optional[Tuple[str, ...]] = None
     
     @abstractmethod
     async def execute(self, **kwargs) -> FunctionResult:
@@ -73,15 +172,52 @@ class BaseFunction(ABC):
         """
         pass
     
+    def sync_execute(self, **kwargs) -> FunctionResult:
+        """
+        Execute the function synchronously.
+        
+        Functions that do no I/O can implement this fast path, which lets
+        the registry skip creating and awaiting a coroutine.
+        
+        Args:
+            **kwargs: Arguments passed to the function
+            
+        Returns:
+            FunctionResult object containing the result
+        """
+        raise NotImplementedError
+    
+    @property
+    def supports_sync_execute(self) -> bool:
+        """Whether the function implements sync_execute()."""
+        return type(self).sync_execute is not BaseFunction.sync_execute
+    
     @abstractmethod
+    def _build_definition(self) -> FunctionDefinition:
+        """
+        Build the function definition for the LLM.
+        
+        Returns:
+            FunctionDefinition object
+        """
+        pass
+    
     def get_definition(self) -> FunctionDefinition:
         """
         Get the function definition for the LLM.
         
+        The definition is built once and then reused, together with the
+        names of its required parameters for validate_arguments().
+        
         Returns:
             FunctionDefinition object
         """
-        pass
+        if self._definition is None:
+            self._definition = self._build_definition()
+            self._required_params = tuple(
+                param.name for param in self._definition.parameters if param.required
+            )
+        return self._definition
     
     def validate_arguments(self, arguments: Dict[str, Any]) -> List[str]:
         """
@@ -93,13 +229,17 @@ class BaseFunction(ABC):
         Returns:
             List of error messages, empty if valid
         """
-        errors = []
-        definition = self.get_definition()
+        # Definitions are static, so the required names are computed only once,
+        # usually when the function is registered
+        if self._required_params is None:
+            self.get_definition()
         
         # Check required parameters
-        for param in definition.parameters:
-            if param.required and param.name not in arguments:
-                errors.append(f"Missing required parameter: {param.name}")
+        errors = [
+            f"Missing required parameter: {name}"
+            for name in self._required_params
+            if name not in arguments
+        ]
         
         # Note: We allow unknown parameters (like 'kg' which is auto-set by registry)
         # This allows the registry to pass kg without it being in the function definition
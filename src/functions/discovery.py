@@ -1,8 +1,281 @@
 """Property discovery functions for exploring knowledge graph schemas."""
 
+import asyncio
+import heapq
+from operator import itemgetter
+from string import Template
 from typing import Dict, List, Optional, Any
-from .base import BaseFunction, FunctionDefinition, FunctionParameter, FunctionResult
-from ..sparql.qlever_client import QLeverClient
+from .base import BaseFunction, FunctionDefinition, FunctionParameter, FunctionResult, safe_int
+from ..sparql.qlever_client import QLeverClient, SPARQLResult, get_shared_client
+from ..sparql.validator import QueryValidator
+from ..sparql.wikidata_search_client import WikidataSearchClient
+from ..utils.cache import TTLCache
+from ..utils.config import get_endpoint_url, load_resolved_config
+
+
+# SPARQL query templates, parsed once at import time
+
+_TEXT_SEARCH_PATTERN = Template("""?property rdfs:label ?label .
+  ?text ql:contains-entity ?label .
+  ?text ql:contains-word $words .
+  FILTER(LANG(?label) = "en" || LANG(?label) = "")""")
+
+# The language filters sit inside each branch so that they are applied
+# before the union rather than to its result
+_SUBSTRING_SEARCH_PATTERN = Template("""{
+    ?property rdfs:label ?label .
+    FILTER(CONTAINS(LCASE(?label), $concept) && (LANG(?label) = "en" || LANG(?label) = ""))
+  } UNION {
+    ?property skos:altLabel ?label .
+    FILTER(CONTAINS(LCASE(?label), $concept) && (LANG(?label) = "en" || LANG(?label) = ""))
+  } UNION {
+    ?property schema:name ?label .
+    FILTER(CONTAINS(LCASE(?label), $concept) && (LANG(?label) = "en" || LANG(?label) = ""))
+  } UNION {
+    ?property rdfs:comment ?description .
+    FILTER(CONTAINS(LCASE(?description), $concept) && (LANG(?description) = "en" || LANG(?description) = ""))
+  }""")
+
+_SEARCH_PREFIXES = """PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+PREFIX schema: <http://schema.org/>
+PREFIX ql: <http://qlever.cs.uni-freiburg.de/builtin-functions/>
+"""
+
+# Properties matching a concept, flagging those with values for an entity
+_DISCOVER_QUERY = Template(_SEARCH_PREFIXES + """
+SELECT DISTINCT ?property ?label ?description ?has_values WHERE {
+  $concept_pattern
+  OPTIONAL { ?property rdfs:comment ?description . }
+  OPTIONAL { <$entity> ?property ?any . BIND(true AS ?has_values) }
+}
+LIMIT $limit
+""")
+
+# Candidate properties that have at least one value for an entity
+_PROPERTIES_WITH_VALUES_QUERY = Template("""
+SELECT ?property WHERE {
+  VALUES ?property { $values }
+  FILTER EXISTS { <$entity> ?property ?value }
+}
+""")
+
+# Properties matching a concept
+_CONCEPT_SEARCH_QUERY = Template(_SEARCH_PREFIXES + """
+SELECT DISTINCT ?property ?label ?description WHERE {
+  $concept_pattern
+  OPTIONAL { ?property rdfs:comment ?description . }
+}
+LIMIT $limit
+""")
+
+# Properties matching several concepts, one limited subquery per concept so
+# that a concept with many matches cannot crowd out the others
+_BATCH_CONCEPT_SEARCH_QUERY = Template(_SEARCH_PREFIXES + """
+SELECT ?concept ?property ?label ?description WHERE {
+  $branches
+}
+""")
+
+_BATCH_CONCEPT_SEARCH_BRANCH = Template("""{
+    SELECT DISTINCT ?concept ?property ?label ?description WHERE {
+      $concept_pattern
+      OPTIONAL { ?property rdfs:comment ?description . }
+      BIND($concept AS ?concept)
+    }
+    LIMIT $limit
+  }""")
+
+# Number of triples using each of the given properties
+_USAGE_COUNT_QUERY = Template("""
+SELECT ?property (COUNT(*) AS ?usage_count) WHERE {
+  VALUES ?property { $values }
+  ?s ?property ?o .
+}
+GROUP BY ?property
+""")
+
+_DETAILS_QUERY = Template("""
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX schema: <http://schema.org/>
+
+SELECT ?label ?description ?domain ?range ?type WHERE {
+  <$property> rdfs:label ?label .
+  OPTIONAL { <$property> rdfs:comment ?description . }
+  OPTIONAL { <$property> rdfs:domain ?domain . }
+  OPTIONAL { <$property> rdfs:range ?range . }
+  OPTIONAL { <$property> rdf:type ?type . }
+  FILTER(LANG(?label) = "en" || LANG(?label) = "")
+  FILTER(LANG(?description) = "en" || LANG(?description) = "")
+}
+LIMIT 1
+""")
+
+# Number of triples using a property, kept out of the details query so that
+# the schema triples are not joined with every use of the property
+_PROPERTY_USAGE_QUERY = Template("""
+SELECT (COUNT(*) AS ?usage_count) WHERE {
+  ?s <$property> ?o .
+}
+""")
+
+_EXAMPLES_QUERY = Template("""
+SELECT ?subject ?object WHERE {
+  ?subject <$property> ?object .
+}
+LIMIT 5
+""")
+
+
+def _has_text_index(kg: Optional[str]) -> bool:
+    """Check whether concept searches on a knowledge graph use QLever's text index."""
+    text_search_endpoints = load_resolved_config().functions.get('text_search_endpoints') or ()
+    return kg in text_search_endpoints
+
+
+def _concept_match_pattern(kg: Optional[str], concept: str) -> str:
+    """
+    Build the graph pattern that matches properties against a concept.
+    
+    Knowledge graphs listed in ``functions.text_search_endpoints`` are searched
+    through QLever's text index; all others fall back to substring filters
+    over the label, name and comment triples.
+    
+    Args:
+        kg: Knowledge graph name
+        concept: Concept to search for
+    
+    Returns:
+        SPARQL pattern binding ?property and ?label or ?description
+    """
+    words = concept.lower().split()
+    if words and _has_text_index(kg):
+        # Prefix match on the last word, as in QLever's autocompletion
+        words[-1] += "*"
+        return _TEXT_SEARCH_PATTERN.substitute(words=QueryValidator.escape_string(" ".join(words)))
+    
+    # The concept is lowercased here and passed as an escaped literal
+    concept_literal = QueryValidator.escape_string(concept.lower())
+    return _SUBSTRING_SEARCH_PATTERN.substitute(concept=concept_literal)
+
+
+class _ConceptSearchBatcher:
+    """
+    Coalesces concurrent substring concept searches on an endpoint.
+    
+    Searches started in the same event loop iteration, such as those of
+    function calls executed with asyncio.gather, are answered by a single
+    query with one limited subquery per concept; the rows are then
+    partitioned by the concept they matched and handed back to each caller.
+    A search with nothing else pending runs the plain unbatched query.
+    """
+    
+    def __init__(self):
+        """Initialize the batcher."""
+        self._pending: Dict[Any, List[Any]] = {}
+        self._tasks: set = set()
+    
+    async def search(self, endpoint_url: str, concept: str, limit: int) -> SPARQLResult:
+        """
+        Search for properties matching a concept, batched with concurrent searches.
+        
+        Args:
+            endpoint_url: URL of the QLever SPARQL endpoint
+            concept: Lowercased concept to search for
+            limit: Maximum number of rows for this concept
+        
+        Returns:
+            SPARQLResult with the rows matching the concept
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, endpoint_url)
+        future = loop.create_future()
+        
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            task = loop.create_task(self._flush(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        batch.append((concept, limit, future))
+        
+        return await future
+    
+    async def _flush(self, key: Any) -> None:
+        """Run the pending searches for an endpoint once the current iteration is done."""
+        # Yield once so that searches started alongside this one can join,
+        # without delaying a lone search by a timer
+        await asyncio.sleep(0)
+        batch = self._pending.pop(key)
+        
+        try:
+            # Callers searching the same concept share its rows
+            limits: Dict[str, int] = {}
+            for concept, limit, _ in batch:
+                limits[concept] = max(limit, limits.get(concept, 0))
+            
+            if len(limits) == 1:
+                ((concept, limit),) = limits.items()
+                query = _CONCEPT_SEARCH_QUERY.substitute(
+                    concept_pattern=_SUBSTRING_SEARCH_PATTERN.substitute(
+                        concept=QueryValidator.escape_string(concept)
+                    ),
+                    limit=limit
+                )
+            else:
+                branches = []
+                for concept, limit in sorted(limits.items()):
+                    concept_literal = QueryValidator.escape_string(concept)
+                    branches.append(_BATCH_CONCEPT_SEARCH_BRANCH.substitute(
+                        concept_pattern=_SUBSTRING_SEARCH_PATTERN.substitute(concept=concept_literal),
+                        concept=concept_literal,
+                        limit=limit
+                    ))
+                query = _BATCH_CONCEPT_SEARCH_QUERY.substitute(
+                    branches="\n  UNION\n  ".join(branches)
+                )
+            client = await get_shared_client(key[1])
+            result = await client.execute_query(query)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        rows_by_concept: Dict[str, List[Dict[str, Any]]] = {}
+        if len(limits) == 1:
+            rows_by_concept[concept] = result.results or []
+        else:
+            for row in result.results or []:
+                rows_by_concept.setdefault(row.get('concept', ''), []).append(row)
+        
+        for concept, limit, future in batch:
+            if not future.done():
+                future.set_result(SPARQLResult(
+                    success=result.success,
+                    results=rows_by_concept.get(concept, [])[:limit],
+                    columns=result.columns,
+                    error=result.error,
+                    execution_time=result.execution_time
+                ))
+
+
+_concept_search_batcher = _ConceptSearchBatcher()
+
+# ?property is bound in every row of the queries it is read from with this
+_get_property = itemgetter('property')
+
+# Property searches by (kg, lowercased concept, limit)
+_property_search_cache = TTLCache(maxsize=500, ttl=300.0)
+
+# Candidate properties with values for an entity by (kg, entity, candidates)
+_entity_properties_cache = TTLCache(maxsize=500, ttl=300.0)
+
+# Property details by (kg, property); schema data only changes when the
+# knowledge graph is rebuilt, so entries live much longer than search results
+_property_details_cache = TTLCache(maxsize=10000, ttl=86400.0)
 
 
 class DiscoverPropertiesFunction(BaseFunction):
@@ -14,7 +287,7 @@ class DiscoverPropertiesFunction(BaseFunction):
             description="Discover properties related to a specific concept for a given entity"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -59,10 +332,18 @@ class DiscoverPropertiesFunction(BaseFunction):
                 error="Missing required parameters: entity and concept"
             )
         
+        # The entity is interpolated as <entity>, so it must be a plain IRI
+        if not QueryValidator.is_valid_iri(entity):
+            return FunctionResult(
+                success=False,
+                error=f"Invalid entity IRI: {entity}"
+            )
+        
         try:
             # For Wikidata, use the Wikidata Search API
             if kg == "wikidata":
-                from ..sparql.wikidata_search_client import WikidataSearchClient
+                # Endpoint URL from the shared, cached configuration
+                endpoint_url = get_endpoint_url(kg)
                 
                 async with WikidataSearchClient() as wikidata_client:
                     # Search for properties using Wikidata API
@@ -71,84 +352,66 @@ class DiscoverPropertiesFunction(BaseFunction):
                         limit=limit,
                         language="en"
                     )
-                    
-                    if search_results:
-                        # Get entity properties from QLever to check which have values
-                        import yaml
-                        import os
-                        config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-                        with open(config_path, 'r') as f:
-                            config = yaml.safe_load(f)
+                
+                # Check which of the candidates have values for the entity
+                # with one probe, instead of listing all entity properties
+                candidates = frozenset(
+                    f"http://www.wikidata.org/prop/direct/{result.id}" for result in search_results
+                )
+                entity_properties = await self._properties_with_values(
+                    kg, endpoint_url, entity, candidates
+                )
+                
+                if search_results:
+                    # Format results
+                    discovered_properties = []
+                    for result in search_results:
+                        # Convert Wikidata ID to full URI
+                        property_uri = f"http://www.wikidata.org/prop/direct/{result.id}"
                         
-                        endpoints = config.get('endpoints', {})
-                        endpoint_url = endpoints.get(kg)
+                        # Check if this property has values for the entity
+                        has_values = property_uri in entity_properties
                         
-                        entity_properties = []
-                        if endpoint_url:
-                            # Get properties that actually exist for this entity
-                            entity_properties_query = f"""
-                            SELECT DISTINCT ?property WHERE {{
-                              <{entity}> ?property ?value .
-                            }}
-                            LIMIT 100
-                            """
-                            async with QLeverClient(endpoint_url) as client:
-                                entity_props_result = await client.execute_query(entity_properties_query)
-                                if entity_props_result.success and entity_props_result.results:
-                                    entity_properties = [row.get('property', '') for row in entity_props_result.results]
+                        discovered_properties.append({
+                            'property': property_uri,
+                            'wikidata_id': result.id,
+                            'label': result.label,
+                            'description': result.description or '',
+                            'has_values_for_entity': has_values
+                        })
                     
-                        # Format results
-                        discovered_properties = []
-                        for result in search_results:
-                            # Convert Wikidata ID to full URI
-                            property_uri = f"http://www.wikidata.org/prop/direct/{result.id}"
-                            
-                            # Check if this property has values for the entity
-                            has_values = property_uri in entity_properties
-                            
-                            discovered_properties.append({
-                                'property': property_uri,
-                                'wikidata_id': result.id,
-                                'label': result.label,
-                                'description': result.description or '',
-                                'has_values_for_entity': has_values
-                            })
-                        
-                        # Sort: properties with values for entity first, then by label
-                        discovered_properties.sort(key=lambda x: (not x['has_values_for_entity'], x.get('label', '')))
-                        
-                        return FunctionResult(
-                            success=True,
-                            result={
-                                'entity': entity,
-                                'concept': concept,
-                                'properties': discovered_properties[:limit],
-                                'total_found': len(discovered_properties)
-                            }
-                        )
-                    else:
-                        return FunctionResult(
-                            success=True,
-                            result={
-                                'entity': entity,
-                                'concept': concept,
-                                'properties': [],
-                                'total_found': 0,
-                                'message': 'No properties found matching the concept'
-                            }
-                        )
+                    # Properties with values for entity first, then by label; only the
+                    # returned ones need to be ordered
+                    top_properties = heapq.nsmallest(
+                        limit, discovered_properties,
+                        key=lambda x: (not x['has_values_for_entity'], x['label'])
+                    )
+                    
+                    return FunctionResult(
+                        success=True,
+                        result={
+                            'entity': entity,
+                            'concept': concept,
+                            'properties': top_properties,
+                            'total_found': len(discovered_properties)
+                        }
+                    )
+                else:
+                    return FunctionResult(
+                        success=True,
+                        result={
+                            'entity': entity,
+                            'concept': concept,
+                            'properties': [],
+                            'total_found': 0,
+                            'message': 'No properties found matching the concept'
+                        }
+                    )
             
             # For other knowledge graphs, use SPARQL search
             else:
-                # Get endpoint URL from config
-                import yaml
-                import os
-                config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                
-                endpoints = config.get('endpoints', {})
-                endpoint_url = endpoints.get(kg)
+                # Endpoint URL from the shared, cached configuration
+                endpoint_url = get_endpoint_url(kg)
                 
                 if not endpoint_url:
                     return FunctionResult(
@@ -156,96 +419,96 @@ class DiscoverPropertiesFunction(BaseFunction):
                         error=f"Unknown knowledge graph: {kg}"
                     )
                 
-                # First, get properties that actually exist for this entity
-                entity_properties_query = f"""
-                SELECT DISTINCT ?property (COUNT(?value) as ?count) WHERE {{
-                  <{entity}> ?property ?value .
-                }}
-                GROUP BY ?property
-                ORDER BY DESC(?count)
-                LIMIT 20
-                """
+                # Search for property labels/descriptions matching the concept,
+                # flagging the properties that have values for the entity
+                property_search_query = _DISCOVER_QUERY.substitute(
+                    concept_pattern=_concept_match_pattern(kg, concept),
+                    entity=entity,
+                    limit=limit
+                )
                 
-                # Then search for property labels/descriptions matching the concept
-                property_search_query = f"""
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-                PREFIX schema: <http://schema.org/>
+                client = await get_shared_client(endpoint_url)
+                search_result = await client.execute_query(property_search_query)
                 
-                SELECT DISTINCT ?property ?label ?description WHERE {{
-                  {{
-                    ?property rdfs:label ?label .
-                    FILTER(CONTAINS(LCASE(?label), LCASE("{concept}")))
-                  }} UNION {{
-                    ?property skos:altLabel ?label .
-                    FILTER(CONTAINS(LCASE(?label), LCASE("{concept}")))
-                  }} UNION {{
-                    ?property schema:name ?label .
-                    FILTER(CONTAINS(LCASE(?label), LCASE("{concept}")))
-                  }} UNION {{
-                    ?property rdfs:comment ?description .
-                    FILTER(CONTAINS(LCASE(?description), LCASE("{concept}")))
-                  }}
-                  OPTIONAL {{ ?property rdfs:comment ?description . }}
-                  FILTER(LANG(?label) = "en" || LANG(?label) = "" || LANG(?description) = "en" || LANG(?description) = "")
-                }}
-                LIMIT {limit}
-                """
+                discovered_properties = []
+                if search_result.success and search_result.results:
+                    for row in search_result.results:
+                        prop = row.get('property', '')
+                        label = row.get('label', '')
+                        description = row.get('description', '')
+                        
+                        # Whether this property exists for the entity
+                        has_values = row.get('has_values') == 'true'
+                        
+                        discovered_properties.append({
+                            'property': prop,
+                            'label': label,
+                            'description': description,
+                            'has_values_for_entity': has_values
+                        })
                 
-                async with QLeverClient(endpoint_url) as client:
-                    # Get properties of the entity
-                    entity_props_result = await client.execute_query(entity_properties_query)
-                    
-                    # Search for properties matching the concept
-                    search_result = await client.execute_query(property_search_query)
-                    
-                    # Combine results
-                    entity_properties = []
-                    if entity_props_result.success and entity_props_result.results:
-                        for row in entity_props_result.results:
-                            prop = row.get('property', '')
-                            count = row.get('count', '0')
-                            entity_properties.append({
-                                'property': prop,
-                                'value_count': int(count) if count.isdigit() else 0,
-                                'has_values_for_entity': True
-                            })
-                    
-                    discovered_properties = []
-                    if search_result.success and search_result.results:
-                        for row in search_result.results:
-                            prop = row.get('property', '')
-                            label = row.get('label', '')
-                            description = row.get('description', '')
-                            
-                            # Check if this property exists for the entity
-                            has_values = any(p['property'] == prop for p in entity_properties)
-                            
-                            discovered_properties.append({
-                                'property': prop,
-                                'label': label,
-                                'description': description,
-                                'has_values_for_entity': has_values
-                            })
-                    
-                    # Sort: properties with values for entity first, then by relevance
-                    discovered_properties.sort(key=lambda x: (not x['has_values_for_entity'], x.get('label', '')))
-                    
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'entity': entity,
-                            'concept': concept,
-                            'properties': discovered_properties[:limit],
-                            'total_found': len(discovered_properties)
-                        }
-                    )
-                    
+                # Properties with values for entity first, then by relevance; only the
+                # returned ones need to be ordered
+                top_properties = heapq.nsmallest(
+                    limit, discovered_properties,
+                    key=lambda x: (not x['has_values_for_entity'], x['label'])
+                )
+                
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'entity': entity,
+                        'concept': concept,
+                        'properties': top_properties,
+                        'total_found': len(discovered_properties)
+                    }
+                )
+        
         except Exception as e:
             return FunctionResult(
                 success=False,
                 error=f"Property discovery failed: {str(e)}"
             )
+    
+    async def _properties_with_values(
+        self,
+        kg: str,
+        endpoint_url: Optional[str],
+        entity: str,
+        candidates: frozenset
+    ) -> frozenset:
+        """
+        Find which candidate properties have values for an entity.
+        
+        Args:
+            kg: Knowledge graph name
+            endpoint_url: SPARQL endpoint URL, or None if not configured
+            entity: Entity IRI
+            candidates: Property IRIs to check
+        
+        Returns:
+            The candidates that have at least one value for the entity
+        """
+        if not candidates or not endpoint_url:
+            return frozenset()
+        
+        cache_key = (kg, entity, candidates)
+        cached = _entity_properties_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # FILTER EXISTS stops at the first value of each candidate, so
+        # neither the values nor duplicate rows are materialized
+        values = " ".join(f"<{uri}>" for uri in sorted(candidates))
+        query = _PROPERTIES_WITH_VALUES_QUERY.substitute(values=values, entity=entity)
+        client = await get_shared_client(endpoint_url)
+        result = await client.execute_query(query)
+        if not result.success:
+            return frozenset()
+        
+        properties = frozenset(map(_get_property, result.results or []))
+        _entity_properties_cache.set(cache_key, properties)
+        return properties
 
 
 class SearchPropertyByConceptFunction(BaseFunction):
@@ -261,7 +524,7 @@ class SearchPropertyByConceptFunction(BaseFunction):
             description="Search for properties with labels or descriptions matching a concept"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -299,11 +562,23 @@ class SearchPropertyByConceptFunction(BaseFunction):
                 error="Missing required parameter: concept"
             )
         
+        # Search results are stable in the short term, so repeated
+        # searches for the same concept are answered from the cache
+        cache_key = (kg, concept.lower(), limit)
+        cached = _property_search_cache.get(cache_key)
+        if cached is not None:
+            return FunctionResult(success=True, result=dict(cached, concept=concept))
+        
+        result = await self._search(kg, concept, limit)
+        if result.success:
+            _property_search_cache.set(cache_key, result.result)
+        return result
+    
+    async def _search(self, kg: Optional[str], concept: str, limit: int) -> FunctionResult:
+        """Search the knowledge graph for properties matching a concept."""
         try:
             # For Wikidata, use the Wikidata Search API
             if kg == "wikidata":
-                from ..sparql.wikidata_search_client import WikidataSearchClient
-                
                 async with WikidataSearchClient() as wikidata_client:
                     # Search for properties using Wikidata API
                     search_results = await wikidata_client.search_properties(
@@ -346,15 +621,8 @@ class SearchPropertyByConceptFunction(BaseFunction):
             
             # For other knowledge graphs, use SPARQL search
             else:
-                # Get endpoint URL from config
-                import yaml
-                import os
-                config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                
-                endpoints = config.get('endpoints', {})
-                endpoint_url = endpoints.get(kg)
+                # Endpoint URL from the shared, cached configuration
+                endpoint_url = get_endpoint_url(kg)
                 
                 if not endpoint_url:
                     return FunctionResult(
@@ -363,87 +631,102 @@ class SearchPropertyByConceptFunction(BaseFunction):
                     )
                 
                 # Search for properties matching the concept
-                query = f"""
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-                PREFIX schema: <http://schema.org/>
-                
-                SELECT DISTINCT ?property ?label ?description (COUNT(?usage) as ?usage_count) WHERE {{
-                  {{
-                    ?property rdfs:label ?label .
-                    FILTER(CONTAINS(LCASE(?label), LCASE("{concept}")))
-                  }} UNION {{
-                    ?property skos:altLabel ?label .
-                    FILTER(CONTAINS(LCASE(?label), LCASE("{concept}")))
-                  }} UNION {{
-                    ?property schema:name ?label .
-                    FILTER(CONTAINS(LCASE(?label), LCASE("{concept}")))
-                  }} UNION {{
-                    ?property rdfs:comment ?description .
-                    FILTER(CONTAINS(LCASE(?description), LCASE("{concept}")))
-                  }}
-                  OPTIONAL {{ ?property rdfs:comment ?description . }}
-                  OPTIONAL {{ ?s ?property ?o . BIND(1 as ?usage) }}
-                  FILTER(LANG(?label) = "en" || LANG(?label) = "" || LANG(?description) = "en" || LANG(?description) = "")
-                }}
-                GROUP BY ?property ?label ?description
-                ORDER BY DESC(?usage_count)
-                LIMIT {limit}
-                """
-                
-                async with QLeverClient(endpoint_url) as client:
+                client = await get_shared_client(endpoint_url)
+                if _has_text_index(kg):
+                    query = _CONCEPT_SEARCH_QUERY.substitute(
+                        concept_pattern=_concept_match_pattern(kg, concept),
+                        limit=limit
+                    )
                     result = await client.execute_query(query)
+                else:
+                    # Concurrent searches on the same endpoint share one query
+                    result = await _concept_search_batcher.search(endpoint_url, concept.lower(), limit)
+                
+                if result.success and result.results:
+                    # Count the usage of the matching properties only; joining
+                    # all triples of the graph into the search is far too costly
+                    usage_counts = await self._usage_counts(
+                        client,
+                        set(map(_get_property, result.results))
+                    )
                     
-                    if result.success and result.results:
-                        properties = []
-                        for row in result.results:
-                            prop = row.get('property', '')
-                            label = row.get('label', '')
-                            description = row.get('description', '')
-                            usage_count = row.get('usage_count', '0')
-                            
-                            # Extract property ID from URI if possible
-                            property_id = ''
-                            if '/prop/direct/' in prop:
-                                property_id = prop.split('/prop/direct/')[-1]
-                            else:
-                                # Try to get the last part of the URI
-                                parts = prop.rstrip('/').split('/')
-                                if parts:
-                                    property_id = parts[-1]
-                            
-                            properties.append({
-                                'property': prop,
-                                'label': label,
-                                'description': description,
-                                'usage_count': int(usage_count) if usage_count.isdigit() else 0,
-                                'property_id': property_id
-                            })
+                    properties = []
+                    for row in result.results:
+                        prop = row.get('property', '')
+                        label = row.get('label', '')
+                        description = row.get('description', '')
+                        usage_count = usage_counts.get(prop, '0')
                         
-                        return FunctionResult(
-                            success=True,
-                            result={
-                                'concept': concept,
-                                'properties': properties,
-                                'total_found': len(properties)
-                            }
-                        )
-                    else:
-                        return FunctionResult(
-                            success=True,
-                            result={
-                                'concept': concept,
-                                'properties': [],
-                                'total_found': 0,
-                                'message': 'No properties found matching the concept'
-                            }
-                        )
+                        # Extract property ID from URI if possible
+                        property_id = ''
+                        if '/prop/direct/' in prop:
+                            property_id = prop.split('/prop/direct/')[-1]
+                        else:
+                            # Try to get the last part of the URI
+                            parts = prop.rstrip('/').split('/')
+                            if parts:
+                                property_id = parts[-1]
+                        
+                        properties.append({
+                            'property': prop,
+                            'label': label,
+                            'description': description,
+                            'usage_count': safe_int(usage_count),
+                            'property_id': property_id
+                        })
+                    
+                    # Most used properties first
+                    properties.sort(key=lambda x: x['usage_count'], reverse=True)
                     
+                    return FunctionResult(
+                        success=True,
+                        result={
+                            'concept': concept,
+                            'properties': properties,
+                            'total_found': len(properties)
+                        }
+                    )
+                else:
+                    return FunctionResult(
+                        success=True,
+                        result={
+                            'concept': concept,
+                            'properties': [],
+                            'total_found': 0,
+                            'message': 'No properties found matching the concept'
+                        }
+                    )
+        
         except Exception as e:
             return FunctionResult(
                 success=False,
                 error=f"Property search failed: {str(e)}"
             )
+    
+    async def _usage_counts(self, client: QLeverClient, properties: set) -> Dict[str, str]:
+        """
+        Count the triples using each of the given properties.
+        
+        Args:
+            client: QLever client to query
+            properties: Property IRIs
+        
+        Returns:
+            Dictionary mapping property IRIs to their usage count, as returned
+            by the endpoint; empty if the query fails
+        """
+        values = " ".join(f"<{prop}>" for prop in sorted(properties) if QueryValidator.is_valid_iri(prop))
+        if not values:
+            return {}
+        
+        usage_query = _USAGE_COUNT_QUERY.substitute(values=values)
+        usage_result = await client.execute_query(usage_query)
+        if not usage_result.success:
+            return {}
+        return {
+            row.get('property', ''): row.get('usage_count', '0')
+            for row in usage_result.results or []
+        }
 
 
 class GetPropertyDetailsFunction(BaseFunction):
@@ -459,7 +742,7 @@ class GetPropertyDetailsFunction(BaseFunction):
             description="Get detailed information about a property including domain, range, and description"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -469,6 +752,12 @@ class GetPropertyDetailsFunction(BaseFunction):
                     type="string",
                     description="Property IRI",
                     required=True
+                ),
+                FunctionParameter(
+                    name="include_usage_count",
+                    type="boolean",
+                    description="Also count the triples using the property (default: false, costly for common properties)",
+                    required=False
                 )
             ]
         )
@@ -476,6 +765,11 @@ class GetPropertyDetailsFunction(BaseFunction):
     async def execute(self, **kwargs) -> FunctionResult:
         kg = kwargs.get("kg")
         property_uri = kwargs.get("property")
+        include_usage_count = kwargs.get("include_usage_count", False)
+        
+        # Convert include_usage_count to boolean if it's a string
+        if isinstance(include_usage_count, str):
+            include_usage_count = include_usage_count.lower() in ('true', '1', 'yes')
         
         if not property_uri:
             return FunctionResult(
@@ -483,16 +777,21 @@ class GetPropertyDetailsFunction(BaseFunction):
                 error="Missing required parameter: property"
             )
         
+        # The property is interpolated as <property>, so it must be a plain IRI
+        if not QueryValidator.is_valid_iri(property_uri):
+            return FunctionResult(
+                success=False,
+                error=f"Invalid property IRI: {property_uri}"
+            )
+        
+        cache_key = (kg, property_uri, bool(include_usage_count))
+        cached = _property_details_cache.get(cache_key)
+        if cached is not None:
+            return FunctionResult(success=True, result=cached)
+        
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -501,75 +800,75 @@ class GetPropertyDetailsFunction(BaseFunction):
                 )
             
             # Query for property details
-            query = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX schema: <http://schema.org/>
-            
-            SELECT ?label ?description ?domain ?range ?type (COUNT(?s) as ?usage_count) WHERE {{
-              <{property_uri}> rdfs:label ?label .
-              OPTIONAL {{ <{property_uri}> rdfs:comment ?description . }}
-              OPTIONAL {{ <{property_uri}> rdfs:domain ?domain . }}
-              OPTIONAL {{ <{property_uri}> rdfs:range ?range . }}
-              OPTIONAL {{ <{property_uri}> rdf:type ?type . }}
-              OPTIONAL {{ ?s <{property_uri}> ?o . }}
-              FILTER(LANG(?label) = "en" || LANG(?label) = "")
-              FILTER(LANG(?description) = "en" || LANG(?description) = "")
-            }}
-            GROUP BY ?label ?description ?domain ?range ?type
-            LIMIT 1
-            """
+            query = _DETAILS_QUERY.substitute(property=property_uri)
             
             # Also get example values
-            example_query = f"""
-            SELECT ?subject ?object WHERE {{
-              ?subject <{property_uri}> ?object .
-            }}
-            LIMIT 5
-            """
+            example_query = _EXAMPLES_QUERY.substitute(property=property_uri)
+            
+            queries = [query, example_query]
+            if include_usage_count:
+                queries.append(_PROPERTY_USAGE_QUERY.substitute(property=property_uri))
+            
+            client = await get_shared_client(endpoint_url)
+            # Get property details, example values and usage count concurrently
+            details_result, example_result, *usage_results = await asyncio.gather(
+                *(client.execute_query(q) for q in queries),
+                return_exceptions=True
+            )
             
-            async with QLeverClient(endpoint_url) as client:
-                # Get property details
-                details_result = await client.execute_query(query)
+            if (
+                isinstance(details_result, SPARQLResult)
+                and details_result.success
+                and details_result.results
+            ):
+                row = details_result.results[0]
                 
-                # Get example values
-                example_result = await client.execute_query(example_query)
+                details = {
+                    'property': property_uri,
+                    'label': row.get('label', ''),
+                    'description': row.get('description', ''),
+                    'domain': row.get('domain', ''),
+                    'range': row.get('range', ''),
+                    'type': row.get('type', '')
+                }
                 
-                if details_result.success and details_result.results:
-                    row = details_result.results[0]
-                    
-                    details = {
-                        'property': property_uri,
-                        'label': row.get('label', ''),
-                        'description': row.get('description', ''),
-                        'domain': row.get('domain', ''),
-                        'range': row.get('range', ''),
-                        'type': row.get('type', ''),
-                        'usage_count': int(row.get('usage_count', '0')) if row.get('usage_count', '0').isdigit() else 0
-                    }
-                    
-                    # Add examples if available
-                    examples = []
-                    if example_result.success and example_result.results:
-                        for ex_row in example_result.results:
-                            examples.append({
-                                'subject': ex_row.get('subject', ''),
-                                'object': ex_row.get('object', '')
-                            })
-                    
-                    details['examples'] = examples
-                    
-                    return FunctionResult(
-                        success=True,
-                        result=details
-                    )
-                else:
-                    return FunctionResult(
-                        success=False,
-                        error=f"Could not retrieve details for property: {property_uri}"
-                    )
-                    
+                if include_usage_count:
+                    usage_result = usage_results[0]
+                    if (
+                        isinstance(usage_result, SPARQLResult)
+                        and usage_result.success
+                        and usage_result.results
+                    ):
+                        details['usage_count'] = safe_int(usage_result.results[0].get('usage_count'))
+                    else:
+                        details['usage_count'] = 0
+                
+                # Add examples if available
+                examples = []
+                if (
+                    isinstance(example_result, SPARQLResult)
+                    and example_result.success
+                    and example_result.results
+                ):
+                    for ex_row in example_result.results:
+                        examples.append({
+                            'subject': ex_row.get('subject', ''),
+                            'object': ex_row.get('object', '')
+                        })
+                
+                details['examples'] = examples
+                _property_details_cache.set(cache_key, details)
+                
+                return FunctionResult(
+                    success=True,
+                    result=details
+                )
+            else:
+                return FunctionResult(
+                    success=False,
+                    error=f"Could not retrieve details for property: {property_uri}"
+                )
+        
         except Exception as e:
             return FunctionResult(
                 success=False,
@@ -1,8 +1,150 @@
 """Schema exploration functions for knowledge graphs."""
 
+import asyncio
+from string import Template
 from typing import Dict, List, Optional, Any
-from .base import BaseFunction, FunctionDefinition, FunctionParameter, FunctionResult
-from ..sparql.qlever_client import QLeverClient
+from .base import BaseFunction, FunctionDefinition, FunctionParameter, FunctionResult, safe_int
+from ..sparql.qlever_client import (
+    QLeverClient,
+    execute_cached_query,
+    execute_coalesced_query,
+    get_shared_client,
+)
+from ..sparql.validator import QueryValidator
+from ..utils.config import get_endpoint_url
+
+
+# SPARQL query templates, parsed once at import time
+
+# Properties of an entity with their number of values
+_PROPERTIES_QUERY = Template("""
+SELECT DISTINCT ?property (COUNT(?value) as ?value_count) WHERE {
+  <$entity> ?property ?value .
+}
+GROUP BY ?property
+ORDER BY DESC(?value_count)
+LIMIT 500
+""")
+
+# Properties of an entity whose IRI or a label contains a filter literal
+_FILTERED_PROPERTIES_QUERY = Template("""
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+SELECT ?property ?value_count WHERE {
+  {
+    SELECT ?property (COUNT(?value) as ?value_count) WHERE {
+      <$entity> ?property ?value .
+    }
+    GROUP BY ?property
+  }
+  FILTER(
+    CONTAINS(LCASE(STR(?property)), $filter)
+    || EXISTS {
+      ?property rdfs:label|skos:altLabel ?filter_label .
+      FILTER(CONTAINS(LCASE(?filter_label), $filter))
+    }
+  )
+}
+ORDER BY DESC(?value_count)
+LIMIT 500
+""")
+
+# Labels of several properties
+_PROPERTY_LABELS_QUERY = Template("""
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+SELECT ?property ?label WHERE {
+  VALUES ?property { $values }
+  { ?property rdfs:label ?label . }
+  UNION { ?property skos:altLabel ?label . }
+}
+""")
+
+# All values of several properties of an entity
+_BATCHED_EXAMPLES_QUERY = Template("""
+SELECT ?property ?value WHERE {
+  VALUES ?property { $values }
+  <$entity> ?property ?value .
+}
+""")
+
+_EXAMPLES_QUERY = Template("""
+SELECT ?value WHERE {
+  <$entity> <$property> ?value .
+}
+LIMIT $limit
+""")
+
+_DIRECT_CONNECTIONS_QUERY = Template("""
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT ?property ?label WHERE {
+  <$entity1> ?property <$entity2> .
+  OPTIONAL {
+    ?property rdfs:label ?label .
+    FILTER(LANG(?label) = "en" || LANG(?label) = "")
+  }
+}
+LIMIT $limit
+""")
+
+# Outgoing edges of the path search frontier to nodes not visited yet
+_EXPAND_FRONTIER_QUERY = Template("""
+SELECT ?node ?property ?next WHERE {
+  VALUES ?node { $nodes }
+  ?node ?property ?next .
+  FILTER(isIRI(?next))
+  MINUS { VALUES ?next { $visited } }
+}
+LIMIT $limit
+""")
+
+# Two-hop connections from the path search frontier to the target entity; the
+# paths of every length are completed with this join, entity1 being the first
+# frontier
+_CONNECT_THROUGH_FRONTIER_QUERY = Template("""
+SELECT ?node ?property ?next ?last_property WHERE {
+  VALUES ?node { $nodes }
+  ?node ?property ?next .
+  ?next ?last_property <$entity2> .
+  MINUS { VALUES ?next { $visited } }
+}
+LIMIT $limit
+""")
+
+_PROPERTY_VALUES_QUERY = Template("""
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT ?subject ?value (COUNT(*) as ?usage_count) WHERE {
+  ?subject <$property> ?value .
+  $value_filter
+}
+GROUP BY ?subject ?value
+ORDER BY DESC(?usage_count)
+LIMIT $limit
+""")
+
+_PROPERTY_STATS_QUERY = Template("""
+SELECT
+  (COUNT(DISTINCT ?subject) as ?subject_count)
+  (COUNT(DISTINCT ?value) as ?value_count)
+  (COUNT(*) as ?total_uses)
+WHERE {
+  ?subject <$property> ?value .
+}
+""")
+
+# Maximum number of edges followed from each level of the relationship path search
+_PATH_FRONTIER_LIMIT = 1000
+
+# Longest relationship path searched, whatever the caller asks for; each extra
+# hop costs more round trips and larger queries
+_MAX_PATH_LENGTH = 3
+
+# Maximum number of visited nodes inlined into the path search queries
+_PATH_VISITED_LIMIT = 2000
 
 
 class GetEntityPropertiesFunction(BaseFunction):
@@ -14,7 +156,7 @@ class GetEntityPropertiesFunction(BaseFunction):
             description="Get all properties of an entity with example values"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -85,16 +227,16 @@ class GetEntityPropertiesFunction(BaseFunction):
                 error="Missing required parameter: entity"
             )
         
+        # The entity is interpolated as <entity>, so it must be a plain IRI
+        if not QueryValidator.is_valid_iri(entity):
+            return FunctionResult(
+                success=False,
+                error=f"Invalid entity IRI: {entity}"
+            )
+        
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -104,175 +246,255 @@ class GetEntityPropertiesFunction(BaseFunction):
             
             # First, get all distinct properties for the entity
             # Use higher limit to include properties with few values (like population, capital)
-            properties_query = f"""
-            SELECT DISTINCT ?property (COUNT(?value) as ?value_count) WHERE {{
-              <{entity}> ?property ?value .
-            }}
-            GROUP BY ?property
-            ORDER BY DESC(?value_count)
-            LIMIT 500
-            """
+            if property_filter and kg != "wikidata":
+                # Only keep properties whose IRI or a label contains the filter,
+                # so that labels and examples are fetched for the candidates
+                # only; labels are matched exactly again below, including
+                # the local names used for unlabeled properties
+                properties_query = _FILTERED_PROPERTIES_QUERY.substitute(
+                    entity=entity,
+                    filter=QueryValidator.escape_string(property_filter.lower())
+                )
+            else:
+                properties_query = _PROPERTIES_QUERY.substitute(entity=entity)
+            
+            client = await get_shared_client(endpoint_url)
+            # Get properties
+            properties_result = await execute_coalesced_query(client, properties_query)
             
-            async with QLeverClient(endpoint_url) as client:
-                # Get properties
-                properties_result = await client.execute_query(properties_query)
+            if not properties_result.success or not properties_result.results:
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'entity': entity,
+                        'properties': [],
+                        'total_properties': 0,
+                        'message': 'No properties found for entity'
+                    }
+                )
+            
+            # For Wikidata, use the Wikidata API to get property labels
+            property_labels = {}
+            if kg == "wikidata":
+                from ..sparql.wikidata_search_client import WikidataSearchClient
                 
-                if not properties_result.success or not properties_result.results:
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'entity': entity,
-                            'properties': [],
-                            'total_properties': 0,
-                            'message': 'No properties found for entity'
-                        }
-                    )
+                # Extract property IDs from URIs (e.g., http://www.wikidata.org/prop/direct/P47 -> P47)
+                property_ids = []
+                for prop_row in properties_result.results:
+                    prop_uri = prop_row.get('property', '')
+                    if '/prop/direct/' in prop_uri:
+                        prop_id = prop_uri.split('/prop/direct/')[-1]
+                        property_ids.append(prop_id)
                 
-                # For Wikidata, use the Wikidata API to get property labels
-                property_labels = {}
-                if kg == "wikidata":
-                    from ..sparql.wikidata_search_client import WikidataSearchClient
-                    
-                    # Extract property IDs from URIs (e.g., http://www.wikidata.org/prop/direct/P47 -> P47)
-                    property_ids = []
-                    for prop_row in properties_result.results:
-                        prop_uri = prop_row.get('property', '')
-                        if '/prop/direct/' in prop_uri:
-                            prop_id = prop_uri.split('/prop/direct/')[-1]
-                            property_ids.append(prop_id)
+                # Fetch labels for all properties using Wikidata API
+                if property_ids:
+                    # Get labels in batch using wbgetentities
+                    async with WikidataSearchClient() as wikidata_client:
+                        entities = await wikidata_client.get_entities_info(
+                            property_ids[:200]  # Limit to 200 properties
+                        )
                     
-                    # Fetch labels for all properties using Wikidata API
-                    if property_ids:
-                        # Get labels in batch using wbgetentities
-                        async with WikidataSearchClient() as wikidata_client:
-                            for prop_id in property_ids[:200]:  # Limit to 200 properties
-                                try:
-                                    info = await wikidata_client.get_entity_info(prop_id)
-                                    if info and 'labels' in info:
-                                        label = info['labels'].get('en', {}).get('value', '')
-                                        description = info.get('descriptions', {}).get('en', {}).get('value', '')
-                                        property_labels[prop_id] = {
-                                            'label': label,
-                                            'description': description
-                                        }
-                                except Exception:
-                                    pass
-                else:
-                    # For non-Wikidata knowledge graphs, fetch property labels using SPARQL
-                    # Extract property URIs
-                    property_uris = []
-                    for prop_row in properties_result.results:
-                        prop_uri = prop_row.get('property', '')
-                        if prop_uri:
-                            property_uris.append(prop_uri)
+                    for prop_id, info in entities.items():
+                        if info and 'labels' in info:
+                            label = info['labels'].get('en', {}).get('value', '')
+                            description = info.get('descriptions', {}).get('en', {}).get('value', '')
+                            property_labels[prop_id] = {
+                                'label': label,
+                                'description': description
+                            }
+            else:
+                # For non-Wikidata knowledge graphs, fetch property labels using SPARQL
+                # Extract property URIs
+                property_uris = []
+                for prop_row in properties_result.results:
+                    prop_uri = prop_row.get('property', '')
+                    if prop_uri:
+                        property_uris.append(prop_uri)
+                
+                # Fetch labels for properties using SPARQL
+                if property_uris:
+                    # Build a query to get labels for all properties
+                    # Use UNION to search for rdfs:label or skos:altLabel
+                    label_values = " ".join(
+                        f"<{uri}>" for uri in property_uris if QueryValidator.is_valid_iri(uri)
+                    )
                     
-                    # Fetch labels for properties using SPARQL
-                    if property_uris:
-                        # Build a query to get labels for all properties
-                        # Use UNION to search for rdfs:label, skos:altLabel, or any literal value
-                        prop_uris_str = " ".join([f"<{uri}>" for uri in property_uris])
-                        labels_query = f"""
-                        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-                        
-                        SELECT ?property ?label WHERE {{
-                          {{ ?property rdfs:label ?label . }}
-                          UNION {{ ?property skos:altLabel ?label . }}
-                          FILTER(?property IN ({prop_uris_str}))
-                        }}
-                        """
-                        
-                        labels_result = await client.execute_query(labels_query)
+                    if label_values:
+                        labels_query = _PROPERTY_LABELS_QUERY.substitute(values=label_values)
+                        labels_result = await execute_cached_query(client, labels_query)
                         if labels_result.success and labels_result.results:
                             for row in labels_result.results:
                                 prop_uri = row.get('property', '')
                                 label = row.get('label', '')
                                 if prop_uri and label:
                                     property_labels[prop_uri] = label
-                        
-                        # For properties without labels, use the local name from the URI
-                        for prop_uri in property_uris:
-                            if prop_uri not in property_labels:
-                                # Extract local name from URI (e.g., http://example.org/onto#nome -> nome)
-                                if '#' in prop_uri:
-                                    local_name = prop_uri.split('#')[-1]
-                                elif '/' in prop_uri:
-                                    local_name = prop_uri.rstrip('/').split('/')[-1]
-                                else:
-                                    local_name = prop_uri
-                                property_labels[prop_uri] = local_name
+                    
+                    # For properties without labels, use the local name from the URI
+                    for prop_uri in property_uris:
+                        if prop_uri not in property_labels:
+                            # Extract local name from URI (e.g., http://example.org/onto#nome -> nome)
+                            if '#' in prop_uri:
+                                local_name = prop_uri.split('#')[-1]
+                            elif '/' in prop_uri:
+                                local_name = prop_uri.rstrip('/').split('/')[-1]
+                            else:
+                                local_name = prop_uri
+                            property_labels[prop_uri] = local_name
+            
+            # Get property details for each property
+            properties_with_details = []
+            
+            for prop_row in properties_result.results:
+                prop_uri = prop_row.get('property', '')
+                value_count = safe_int(prop_row.get('value_count'))
                 
-                # Get property details and example values for each property
-                properties_with_details = []
+                # Extract property ID for label lookup
+                prop_id = ''
+                if '/prop/direct/' in prop_uri:
+                    prop_id = prop_uri.split('/prop/direct/')[-1]
                 
-                for prop_row in properties_result.results:
-                    prop_uri = prop_row.get('property', '')
-                    value_count = int(prop_row.get('value_count', '0')) if prop_row.get('value_count', '0').isdigit() else 0
-                    
-                    # Extract property ID for label lookup
-                    prop_id = ''
-                    if '/prop/direct/' in prop_uri:
-                        prop_id = prop_uri.split('/prop/direct/')[-1]
-                    
-                    # Get label from Wikidata API (if available) or use property_labels for non-Wikidata
-                    label = ''
-                    if kg == "wikidata":
-                        if prop_id in property_labels:
-                            label = property_labels[prop_id].get('label', '')
-                    else:
-                        # For non-Wikidata, use the property URI as key
-                        label = property_labels.get(prop_uri, '')
-                    
-                    # Skip if property filter is specified and doesn't match
-                    if property_filter and property_filter.lower() not in label.lower():
-                        continue
-                    
-                    # Skip properties without labels unless explicitly requested
-                    if not include_unlabeled and not label:
+                # Get label from Wikidata API (if available) or use property_labels for non-Wikidata
+                label = ''
+                if kg == "wikidata":
+                    if prop_id in property_labels:
+                        label = property_labels[prop_id].get('label', '')
+                else:
+                    # For non-Wikidata, use the property URI as key
+                    label = property_labels.get(prop_uri, '')
+                
+                # Skip if property filter is specified and doesn't match
+                if property_filter and property_filter.lower() not in label.lower():
+                    continue
+                
+                # Skip properties without labels unless explicitly requested
+                if not include_unlabeled and not label:
+                    continue
+                
+                # Filter by keywords if specified (only include if label contains at least one keyword)
+                if keywords_list:
+                    label_lower = label.lower()
+                    if not any(kw in label_lower for kw in keywords_list):
                         continue
-                    
-                    # Filter by keywords if specified (only include if label contains at least one keyword)
-                    if keywords_list:
-                        label_lower = label.lower()
-                        if not any(kw in label_lower for kw in keywords_list):
-                            continue
-                    
-                    # Get example values
-                    examples_query = f"""
-                    SELECT ?value WHERE {{
-                      <{entity}> <{prop_uri}> ?value .
-                    }}
-                    LIMIT {limit_per_property}
-                    """
-                    
-                    examples_result = await client.execute_query(examples_query)
-                    examples = []
-                    if examples_result.success and examples_result.results:
-                        for ex_row in examples_result.results:
-                            examples.append(ex_row.get('value', ''))
-                    
-                    properties_with_details.append({
-                        'property': prop_uri,
-                        'wikidata_id': prop_id,
-                        'label': label,
-                        'value_count': value_count,
-                        'examples': examples
-                    })
                 
-                return FunctionResult(
-                    success=True,
-                    result={
-                        'entity': entity,
-                        'properties': properties_with_details,
-                        'total_properties': len(properties_with_details)
-                    }
+                properties_with_details.append({
+                    'property': prop_uri,
+                    'wikidata_id': prop_id,
+                    'label': label,
+                    'value_count': value_count,
+                    'examples': []
+                })
+            
+            # Get example values. Properties with at most limit_per_property
+            # values are fetched together in one query, since all of their
+            # values are needed anyway; the others need a LIMIT each. The
+            # queries run concurrently, bounded by a semaphore.
+            batched = []
+            unbatched = []
+            for details in properties_with_details:
+                if (
+                    details['value_count'] <= limit_per_property
+                    and QueryValidator.is_valid_iri(details['property'])
+                ):
+                    batched.append(details)
+                else:
+                    unbatched.append(details)
+            
+            semaphore = asyncio.Semaphore(16)
+            await asyncio.gather(
+                self._fetch_batched_examples(client, entity, batched, limit_per_property, semaphore),
+                *(
+                    self._fetch_examples(client, entity, details, limit_per_property, semaphore)
+                    for details in unbatched
                 )
-                    
+            )
+            
+            return FunctionResult(
+                success=True,
+                result={
+                    'entity': entity,
+                    'properties': properties_with_details,
+                    'total_properties': len(properties_with_details)
+                }
+            )
+                
         except Exception as e:
             return FunctionResult(
                 success=False,
                 error=f"Get entity properties failed: {str(e)}"
             )
+    
+    async def _fetch_batched_examples(
+        self,
+        client: QLeverClient,
+        entity: str,
+        properties: List[Dict[str, Any]],
+        limit_per_property: int,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        Fetch the example values of several properties of an entity in one query.
+        
+        Args:
+            client: QLever client to query
+            entity: Entity IRI
+            properties: Property details to fill in; their IRIs must be valid
+            limit_per_property: Maximum example values per property
+            semaphore: Semaphore bounding the concurrent queries
+        """
+        if not properties:
+            return
+        
+        examples_query = _BATCHED_EXAMPLES_QUERY.substitute(
+            entity=entity,
+            values=" ".join(f"<{details['property']}>" for details in properties)
+        )
+        
+        async with semaphore:
+            examples_result = await execute_coalesced_query(client, examples_query)
+        
+        examples_by_property: Dict[str, List[str]] = {}
+        if examples_result.success and examples_result.results:
+            for ex_row in examples_result.results:
+                examples_by_property.setdefault(ex_row.get('property', ''), []).append(
+                    ex_row.get('value', '')
+                )
+        
+        for details in properties:
+            details['examples'] = examples_by_property.get(details['property'], [])[:limit_per_property]
+    
+    async def _fetch_examples(
+        self,
+        client: QLeverClient,
+        entity: str,
+        details: Dict[str, Any],
+        limit_per_property: int,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        Fetch the example values of one property of an entity.
+        
+        Args:
+            client: QLever client to query
+            entity: Entity IRI
+            details: Property details to fill in
+            limit_per_property: Maximum example values
+            semaphore: Semaphore bounding the concurrent queries
+        """
+        # Property IRIs come from the endpoint, but are interpolated all the same
+        if not QueryValidator.is_valid_iri(details['property']):
+            return
+        
+        examples_query = _EXAMPLES_QUERY.substitute(
+            entity=entity,
+            property=details['property'],
+            limit=limit_per_property
+        )
+        
+        async with semaphore:
+            examples_result = await execute_coalesced_query(client, examples_query)
+        
+        if examples_result.success and examples_result.results:
+            details['examples'] = [ex_row.get('value', '') for ex_row in examples_result.results]
 
 
 class FindRelationshipPathsFunction(BaseFunction):
@@ -284,7 +506,7 @@ class FindRelationshipPathsFunction(BaseFunction):
             description="Find how two entities are connected in the knowledge graph"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -304,7 +526,7 @@ class FindRelationshipPathsFunction(BaseFunction):
                 FunctionParameter(
                     name="max_path_length",
                     type="integer",
-                    description="Maximum path length to search (default: 3)",
+                    description="Maximum path length to search (default: 2, at most 3)",
                     required=False
                 ),
                 FunctionParameter(
@@ -320,25 +542,41 @@ class FindRelationshipPathsFunction(BaseFunction):
         kg = kwargs.get("kg")
         entity1 = kwargs.get("entity1")
         entity2 = kwargs.get("entity2")
-        max_path_length = kwargs.get("max_path_length", 3)
+        max_path_length = kwargs.get("max_path_length", 2)
         limit = kwargs.get("limit", 10)
         
+        # Convert max_path_length and limit to integers if they're strings
+        if isinstance(max_path_length, str):
+            try:
+                max_path_length = int(max_path_length)
+            except ValueError:
+                max_path_length = 2
+        if isinstance(limit, str):
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 10
+        
         if not entity1 or not entity2:
             return FunctionResult(
                 success=False,
                 error="Missing required parameters: entity1 and entity2"
             )
         
+        # Every hop adds round trips and query size, so the depth is bounded
+        max_path_length = max(1, min(max_path_length, _MAX_PATH_LENGTH))
+        
+        # The entities are interpolated as <entity>, so they must be plain IRIs
+        for entity in (entity1, entity2):
+            if not QueryValidator.is_valid_iri(entity):
+                return FunctionResult(
+                    success=False,
+                    error=f"Invalid entity IRI: {entity}"
+                )
+        
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -346,102 +584,182 @@ class FindRelationshipPathsFunction(BaseFunction):
                     error=f"Unknown knowledge graph: {kg}"
                 )
             
-            # Build path finding query
-            # This is a simplified path finding query - in production, you might want
-            # a more sophisticated approach for large knowledge graphs
-            path_query = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            client = await get_shared_client(endpoint_url)
             
-            SELECT ?path ?path_length WHERE {{
-              {{
-                # Direct connection
-                SELECT (CONCAT(STR(?p1), " → ", STR(?o1)) as ?path) (1 as ?path_length) WHERE {{
-                  <{entity1}> ?p1 ?o1 .
-                  FILTER(?o1 = <{entity2}>)
-                }}
-                LIMIT {limit}
-              }}
-              UNION
-              {{
-                # Two-hop connection (if max_path_length >= 2)
-                SELECT (CONCAT(STR(?p1), " → ", STR(?mid), " → ", STR(?p2)) as ?path) (2 as ?path_length) WHERE {{
-                  <{entity1}> ?p1 ?mid .
-                  ?mid ?p2 <{entity2}> .
-                  FILTER(?mid != <{entity1}> && ?mid != <{entity2}>)
-                }}
-                LIMIT {limit}
-              }}
-            }}
-            ORDER BY ?path_length
-            LIMIT {limit}
-            """
+            # Direct connections are the paths of length 1
+            direct_query = _DIRECT_CONNECTIONS_QUERY.substitute(
+                entity1=entity1,
+                entity2=entity2,
+                limit=limit
+            )
+            
+            direct_result = await execute_coalesced_query(client, direct_query)
             
-            # For longer paths, we'd need a more complex query
-            # This is a simplified version for demonstration
+            if not direct_result.success:
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'entity1': entity1,
+                        'entity2': entity2,
+                        'paths': [],
+                        'direct_connections': [],
+                        'total_paths_found': 0,
+                        'message': 'No paths found between entities'
+                    }
+                )
+            
+            # A property with several labels is returned once per label
+            direct_labels: Dict[str, str] = {}
+            for d_row in direct_result.results or []:
+                direct_labels.setdefault(d_row.get('property', ''), d_row.get('label', ''))
+            
+            direct_connections = [
+                {'property': prop, 'label': label}
+                for prop, label in list(direct_labels.items())[:5]
+            ]
+            paths = [
+                {'path': f"{prop} → {entity2}", 'length': 1}
+                for prop in direct_labels
+            ]
             
-            async with QLeverClient(endpoint_url) as client:
-                result = await client.execute_query(path_query)
+            # Longer paths are found by a breadth-first search from entity1. The
+            # paths of each length are completed on the server by joining the
+            # previous frontier with two more hops to entity2, so they are all
+            # found, even for hub entities. Only the frontier carried on to the
+            # next level follows a bounded number of edges, which keeps the
+            # queries small when an entity has millions of edges. Paths are kept
+            # as strings of the properties and nodes followed, by the node they
+            # end at.
+            frontier: Dict[str, List[str]] = {entity1: ['']}
+            visited = {entity1, entity2}
+            
+            for length in range(2, max_path_length + 1):
+                if len(paths) >= limit or len(visited) > _PATH_VISITED_LIMIT:
+                    break
                 
-                if result.success:
-                    paths = []
-                    for row in result.results:
-                        path = row.get('path', '')
-                        path_length = int(row.get('path_length', '0')) if row.get('path_length', '0').isdigit() else 0
-                        
-                        paths.append({
-                            'path': path,
-                            'length': path_length
-                        })
-                    
-                    # Also check for direct properties
-                    direct_query = f"""
-                    SELECT ?property ?label WHERE {{
-                      <{entity1}> ?property <{entity2}> .
-                      OPTIONAL {{
-                        ?property rdfs:label ?label .
-                        FILTER(LANG(?label) = "en" || LANG(?label) = "")
-                      }}
-                    }}
-                    LIMIT 5
-                    """
-                    
-                    direct_result = await client.execute_query(direct_query)
-                    direct_connections = []
-                    if direct_result.success and direct_result.results:
-                        for d_row in direct_result.results:
-                            direct_connections.append({
-                                'property': d_row.get('property', ''),
-                                'label': d_row.get('label', '')
-                            })
-                    
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'entity1': entity1,
-                            'entity2': entity2,
-                            'paths': paths,
-                            'direct_connections': direct_connections,
-                            'total_paths_found': len(paths)
-                        }
-                    )
-                else:
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'entity1': entity1,
-                            'entity2': entity2,
-                            'paths': [],
-                            'direct_connections': [],
-                            'total_paths_found': 0,
-                            'message': 'No paths found between entities'
-                        }
+                paths.extend(
+                    await self._connect_through_frontier(
+                        client, frontier, visited, entity2, length, limit - len(paths)
                     )
-                    
+                )
+                
+                if length < max_path_length:
+                    frontier = await self._expand_frontier(client, frontier, visited, limit)
+                    if not frontier:
+                        break
+                    visited.update(frontier)
+            
+            return FunctionResult(
+                success=True,
+                result={
+                    'entity1': entity1,
+                    'entity2': entity2,
+                    'paths': paths,
+                    'direct_connections': direct_connections,
+                    'total_paths_found': len(paths)
+                }
+            )
+                
         except Exception as e:
             return FunctionResult(
                 success=False,
                 error=f"Find relationship paths failed: {str(e)}"
             )
+    
+    async def _expand_frontier(
+        self,
+        client: QLeverClient,
+        frontier: Dict[str, List[str]],
+        visited: set,
+        limit: int
+    ) -> Dict[str, List[str]]:
+        """
+        Follow the outgoing edges of the frontier nodes one hop.
+        
+        Args:
+            client: QLever client to query
+            frontier: Paths by the node they end at
+            visited: Nodes that must not be reached again
+            limit: Maximum number of paths kept per node
+            
+        Returns:
+            Paths extended by one hop, by the new node they end at
+        """
+        expand_query = _EXPAND_FRONTIER_QUERY.substitute(
+            nodes=" ".join(f"<{node}>" for node in frontier),
+            visited=" ".join(f"<{node}>" for node in visited),
+            limit=_PATH_FRONTIER_LIMIT
+        )
+        
+        result = await execute_coalesced_query(client, expand_query)
+        if not result.success:
+            return {}
+        
+        next_frontier: Dict[str, List[str]] = {}
+        for row in result.results or []:
+            node = row.get('node', '')
+            prop = row.get('property', '')
+            next_node = row.get('next', '')
+            if not QueryValidator.is_valid_iri(next_node):
+                continue
+            
+            next_paths = next_frontier.setdefault(next_node, [])
+            for path in frontier.get(node, ()):
+                if len(next_paths) >= limit:
+                    break
+                hop = f"{prop} → {next_node}"
+                next_paths.append(f"{path} → {hop}" if path else hop)
+        
+        return next_frontier
+    
+    async def _connect_through_frontier(
+        self,
+        client: QLeverClient,
+        frontier: Dict[str, List[str]],
+        visited: set,
+        entity2: str,
+        length: int,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Complete the paths that reach entity2 in two more hops.
+        
+        The hops are joined on the server, so no path through the frontier is
+        lost to the limit on the edges followed when expanding it.
+        
+        Args:
+            client: QLever client to query
+            frontier: Paths by the node they end at
+            visited: Nodes that must not be passed through
+            entity2: Target entity IRI
+            length: Length of the completed paths
+            limit: Maximum number of paths to return
+            
+        Returns:
+            List of completed paths
+        """
+        connect_query = _CONNECT_THROUGH_FRONTIER_QUERY.substitute(
+            nodes=" ".join(f"<{node}>" for node in frontier),
+            visited=" ".join(f"<{node}>" for node in visited),
+            entity2=entity2,
+            limit=limit
+        )
+        
+        result = await execute_coalesced_query(client, connect_query)
+        if not result.success:
+            return []
+        
+        paths = []
+        for row in result.results or []:
+            hops = f"{row.get('property', '')} → {row.get('next', '')} → {row.get('last_property', '')}"
+            for path in frontier.get(row.get('node', ''), ()):
+                if len(paths) >= limit:
+                    return paths
+                paths.append({
+                    'path': f"{path} → {hops}" if path else hops,
+                    'length': length
+                })
+        return paths
 
 
 class ExplorePropertyValuesFunction(BaseFunction):
@@ -453,7 +771,7 @@ class ExplorePropertyValuesFunction(BaseFunction):
             description="Explore example values and usage patterns of a property"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -491,16 +809,16 @@ class ExplorePropertyValuesFunction(BaseFunction):
                 error="Missing required parameter: property"
             )
         
+        # The property is interpolated as <property>, so it must be a plain IRI
+        if not QueryValidator.is_valid_iri(property_uri):
+            return FunctionResult(
+                success=False,
+                error=f"Invalid property IRI: {property_uri}"
+            )
+        
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -516,64 +834,51 @@ class ExplorePropertyValuesFunction(BaseFunction):
             else:
                 value_filter = ""
             
-            query = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            
-            SELECT ?subject ?value (COUNT(*) as ?usage_count) WHERE {{
-              ?subject <{property_uri}> ?value .
-              {value_filter}
-            }}
-            GROUP BY ?subject ?value
-            ORDER BY DESC(?usage_count)
-            LIMIT {limit}
-            """
+            query = _PROPERTY_VALUES_QUERY.substitute(
+                property=property_uri,
+                value_filter=value_filter,
+                limit=limit
+            )
             
             # Also get statistics about the property
-            stats_query = f"""
-            SELECT 
-              (COUNT(DISTINCT ?subject) as ?subject_count)
-              (COUNT(DISTINCT ?value) as ?value_count)
-              (COUNT(*) as ?total_uses)
-            WHERE {{
-              ?subject <{property_uri}> ?value .
-            }}
-            """
+            stats_query = _PROPERTY_STATS_QUERY.substitute(property=property_uri)
             
-            async with QLeverClient(endpoint_url) as client:
-                # Get examples
-                examples_result = await client.execute_query(query)
-                
-                # Get statistics
-                stats_result = await client.execute_query(stats_query)
-                
-                examples = []
-                if examples_result.success and examples_result.results:
-                    for row in examples_result.results:
-                        examples.append({
-                            'subject': row.get('subject', ''),
-                            'value': row.get('value', ''),
-                            'usage_count': int(row.get('usage_count', '1')) if row.get('usage_count', '1').isdigit() else 1
-                        })
-                
-                stats = {}
-                if stats_result.success and stats_result.results:
-                    stats_row = stats_result.results[0]
-                    stats = {
-                        'subject_count': int(stats_row.get('subject_count', '0')) if stats_row.get('subject_count', '0').isdigit() else 0,
-                        'value_count': int(stats_row.get('value_count', '0')) if stats_row.get('value_count', '0').isdigit() else 0,
-                        'total_uses': int(stats_row.get('total_uses', '0')) if stats_row.get('total_uses', '0').isdigit() else 0
-                    }
+            client = await get_shared_client(endpoint_url)
+            # Get examples and statistics concurrently; the queries are kept
+            # separate so that the statistics can be served from the cache
+            examples_result, stats_result = await asyncio.gather(
+                execute_coalesced_query(client, query),
+                execute_cached_query(client, stats_query)
+            )
+            
+            examples = []
+            if examples_result.success and examples_result.results:
+                for row in examples_result.results:
+                    examples.append({
+                        'subject': row.get('subject', ''),
+                        'value': row.get('value', ''),
+                        'usage_count': safe_int(row.get('usage_count'), 1)
+                    })
+            
+            stats = {}
+            if stats_result.success and stats_result.results:
+                stats_row = stats_result.results[0]
+                stats = {
+                    'subject_count': safe_int(stats_row.get('subject_count')),
+                    'value_count': safe_int(stats_row.get('value_count')),
+                    'total_uses': safe_int(stats_row.get('total_uses'))
+                }
+            
+            return FunctionResult(
+                success=True,
+                result={
+                    'property': property_uri,
+                    'examples': examples,
+                    'statistics': stats,
+                    'value_type_filter': value_type
+                }
+            )
                 
-                return FunctionResult(
-                    success=True,
-                    result={
-                        'property': property_uri,
-                        'examples': examples,
-                        'statistics': stats,
-                        'value_type_filter': value_type
-                    }
-                )
-                    
         except Exception as e:
             return FunctionResult(
                 success=False,
@@ -1,7 +1,7 @@
 """Function registry for managing available functions."""
 
-from typing import Dict, List, Optional, Any
-from .base import BaseFunction, FunctionResult
+from typing import Dict, List, Optional, Any, Tuple
+from .base import BaseFunction, FunctionDefinition, FunctionResult
 
 
 class FunctionRegistry:
@@ -9,7 +9,15 @@ class FunctionRegistry:
     
     def __init__(self, kg_name: str = "wikidata"):
         self._functions: Dict[str, BaseFunction] = {}
+        # Definitions are static, so each is built once when registered
+        self._definitions: Dict[str, FunctionDefinition] = {}
+        # Definitions in LLM format, rebuilt after the registry changes
+        self._definitions_schema: Optional[List[Dict[str, Any]]] = None
+        # Registered names in registration order, rebuilt after the registry changes
+        self._names: Tuple[str, ...] = ()
         self.kg_name = kg_name
+        # Incremented on every change so callers can invalidate derived caches
+        self.version = 0
     
     def register(self, function: BaseFunction) -> None:
         """
@@ -19,6 +27,10 @@ class FunctionRegistry:
             function: Function to register
         """
         self._functions[function.name] = function
+        self._definitions[function.name] = function.get_definition()
+        self._definitions_schema = None
+        self._names = tuple(self._functions)
+        self.version += 1
     
     def unregister(self, function_name: str) -> None:
         """
@@ -29,6 +41,10 @@ class FunctionRegistry:
         """
         if function_name in self._functions:
             del self._functions[function_name]
+            del self._definitions[function_name]
+            self._definitions_schema = None
+            self._names = tuple(self._functions)
+            self.version += 1
     
     def get_function(self, function_name: str) -> Optional[BaseFunction]:
         """
@@ -42,26 +58,28 @@ class FunctionRegistry:
         """
         return self._functions.get(function_name)
     
-    def list_functions(self) -> List[str]:
+    def list_functions(self) -> Tuple[str, ...]:
         """
         List all registered function names.
         
         Returns:
-            List of function names
+            Tuple of function names in registration order
         """
-        return list(self._functions.keys())
+        return self._names
     
     def get_function_definitions(self) -> List[Dict[str, Any]]:
         """
         Get function definitions in LLM format.
         
+        The list is built once per registry change and shared between
+        callers, so it must not be modified.
+        
         Returns:
             List of function definitions as dictionaries
         """
-        definitions = []
-        for function in self._functions.values():
-            definitions.append(function.get_definition().to_dict())
-        return definitions
+        if self._definitions_schema is None:
+            self._definitions_schema = [definition.schema for definition in self._definitions.values()]
+        return self._definitions_schema
     
     async def execute_function(self, function_name: str, arguments: Dict[str, Any]) -> FunctionResult:
         """
@@ -81,10 +99,9 @@ class FunctionRegistry:
                 error=f"Function '{function_name}' not found"
             )
         
-        # Validate arguments (ignoring kg - it's set by the registry)
-        # Remove kg from arguments for validation since it's auto-set by registry
-        validation_args = {k: v for k, v in arguments.items() if k != "kg"}
-        validation_errors = function.validate_arguments(validation_args)
+        # Validate arguments; only required parameters are checked and kg is
+        # never one of them, so the arguments need no copy without kg
+        validation_errors = function.validate_arguments(arguments)
         if validation_errors:
             return FunctionResult(
                 success=False,
@@ -92,7 +109,10 @@ class FunctionRegistry:
             )
         
         try:
-            # Execute the function with kg_name from registry
+            # Execute the function with kg_name from registry; functions
+            # without I/O run synchronously, without creating a coroutine
+            if function.supports_sync_execute:
+                return function.sync_execute(**arguments, kg=self.kg_name)
             result = await function.execute(**arguments, kg=self.kg_name)
             return result
         except Exception as e:
@@ -104,3 +124,7 @@ class FunctionRegistry:
     def clear(self) -> None:
         """Clear all registered functions."""
         self._functions.clear()
+        self._definitions.clear()
+        self._definitions_schema = None
+        self._names = ()
+        self.version += 1
@@ -2,7 +2,8 @@
 
 from typing import Dict, List, Optional, Any
 from .base import BaseFunction, FunctionDefinition, FunctionParameter, FunctionResult
-from ..sparql.qlever_client import QLeverClient
+from ..sparql.qlever_client import get_shared_client
+from ..utils.config import get_endpoint_url
 
 
 class SearchEntityFunction(BaseFunction):
@@ -14,7 +15,7 @@ class SearchEntityFunction(BaseFunction):
             description="Search for entities (subjects or objects) in a knowledge graph"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -94,15 +95,8 @@ class SearchEntityFunction(BaseFunction):
             
             # For other knowledge graphs, use SPARQL search
             else:
-                # Get endpoint URL from config
-                import yaml
-                import os
-                config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                
-                endpoints = config.get('endpoints', {})
-                endpoint_url = endpoints.get(kg)
+                # Endpoint URL from the shared, cached configuration
+                endpoint_url = get_endpoint_url(kg)
                 
                 if not endpoint_url:
                     return FunctionResult(
@@ -139,53 +133,53 @@ class SearchEntityFunction(BaseFunction):
                 LIMIT {limit}
                 """
                 
-                async with QLeverClient(endpoint_url) as client:
-                    result = await client.execute_query(search_query)
-                    
-                    if result.success and result.results:
-                        # Format results
-                        formatted_results = []
-                        for row in result.results:
-                            entity = row.get('entity', '')
-                            label = row.get('label', '')
-                            description = row.get('description', '')
-                            
-                            # Extract entity ID from URI if possible (for Wikidata-style URIs)
-                            entity_id = ''
-                            if '/entity/' in entity:
-                                entity_id = entity.split('/entity/')[-1]
-                            elif '/prop/direct/' in entity:
-                                entity_id = entity.split('/prop/direct/')[-1]
-                            else:
-                                # Try to get the last part of the URI
-                                parts = entity.rstrip('/').split('/')
-                                if parts:
-                                    entity_id = parts[-1]
-                            
-                            formatted_results.append({
-                                'entity': entity,
-                                'label': label,
-                                'description': description,
-                                'entity_id': entity_id
-                            })
+                client = await get_shared_client(endpoint_url)
+                result = await client.execute_query(search_query)
+                
+                if result.success and result.results:
+                    # Format results
+                    formatted_results = []
+                    for row in result.results:
+                        entity = row.get('entity', '')
+                        label = row.get('label', '')
+                        description = row.get('description', '')
                         
-                        return FunctionResult(
-                            success=True,
-                            result={
-                                'count': len(formatted_results),
-                                'results': formatted_results
-                            }
-                        )
-                    else:
-                        return FunctionResult(
-                            success=True,
-                            result={
-                                'count': 0,
-                                'results': [],
-                                'message': 'No entities found'
-                            }
-                        )
+                        # Extract entity ID from URI if possible (for Wikidata-style URIs)
+                        entity_id = ''
+                        if '/entity/' in entity:
+                            entity_id = entity.split('/entity/')[-1]
+                        elif '/prop/direct/' in entity:
+                            entity_id = entity.split('/prop/direct/')[-1]
+                        else:
+                            # Try to get the last part of the URI
+                            parts = entity.rstrip('/').split('/')
+                            if parts:
+                                entity_id = parts[-1]
+                        
+                        formatted_results.append({
+                            'entity': entity,
+                            'label': label,
+                            'description': description,
+                            'entity_id': entity_id
+                        })
                     
+                    return FunctionResult(
+                        success=True,
+                        result={
+                            'count': len(formatted_results),
+                            'results': formatted_results
+                        }
+                    )
+                else:
+                    return FunctionResult(
+                        success=True,
+                        result={
+                            'count': 0,
+                            'results': [],
+                            'message': 'No entities found'
+                        }
+                    )
+                
         except Exception as e:
             return FunctionResult(
                 success=False,
@@ -202,7 +196,7 @@ class SearchPropertyFunction(BaseFunction):
             description="Search for properties (predicates) in a knowledge graph"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -234,15 +228,8 @@ class SearchPropertyFunction(BaseFunction):
             )
         
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -282,51 +269,51 @@ class SearchPropertyFunction(BaseFunction):
             LIMIT {limit}
             """
             
-            async with QLeverClient(endpoint_url) as client:
-                result = await client.execute_query(search_query)
-                
-                if result.success and result.results:
-                    # Format results
-                    formatted_results = []
-                    for row in result.results:
-                        property_uri = row.get('property', '')
-                        label = row.get('label', '')
-                        description = row.get('description', '')
-                        
-                        # Extract property ID from URI if possible
-                        property_id = ''
-                        if '/prop/direct/' in property_uri:
-                            property_id = property_uri.split('/prop/direct/')[-1]
-                        else:
-                            # Try to get the last part of the URI
-                            parts = property_uri.rstrip('/').split('/')
-                            if parts:
-                                property_id = parts[-1]
-                        
-                        formatted_results.append({
-                            'property': property_uri,
-                            'label': label,
-                            'description': description,
-                            'property_id': property_id
-                        })
+            client = await get_shared_client(endpoint_url)
+            result = await client.execute_query(search_query)
+            
+            if result.success and result.results:
+                # Format results
+                formatted_results = []
+                for row in result.results:
+                    property_uri = row.get('property', '')
+                    label = row.get('label', '')
+                    description = row.get('description', '')
                     
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'count': len(formatted_results),
-                            'results': formatted_results
-                        }
-                    )
-                else:
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'count': 0,
-                            'results': [],
-                            'message': 'No properties found'
-                        }
-                    )
+                    # Extract property ID from URI if possible
+                    property_id = ''
+                    if '/prop/direct/' in property_uri:
+                        property_id = property_uri.split('/prop/direct/')[-1]
+                    else:
+                        # Try to get the last part of the URI
+                        parts = property_uri.rstrip('/').split('/')
+                        if parts:
+                            property_id = parts[-1]
                     
+                    formatted_results.append({
+                        'property': property_uri,
+                        'label': label,
+                        'description': description,
+                        'property_id': property_id
+                    })
+                
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'count': len(formatted_results),
+                        'results': formatted_results
+                    }
+                )
+            else:
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'count': 0,
+                        'results': [],
+                        'message': 'No properties found'
+                    }
+                )
+                
         except Exception as e:
             return FunctionResult(
                 success=False,
@@ -343,7 +330,7 @@ class ListTriplesFunction(BaseFunction):
             description="List triples from a knowledge graph with optional constraints"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -390,15 +377,8 @@ class ListTriplesFunction(BaseFunction):
             )
         
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -437,32 +417,32 @@ class ListTriplesFunction(BaseFunction):
             LIMIT {limit}
             """
             
-            async with QLeverClient(endpoint_url) as client:
-                result = await client.execute_query(query)
+            client = await get_shared_client(endpoint_url)
+            result = await client.execute_query(query)
+            
+            if result.success:
+                # Format results
+                formatted_results = []
+                for row in result.results:
+                    formatted_results.append({
+                        'subject': row.get('s', ''),
+                        'property': row.get('p', ''),
+                        'object': row.get('o', '')
+                    })
+                
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'count': len(formatted_results),
+                        'triples': formatted_results
+                    }
+                )
+            else:
+                return FunctionResult(
+                    success=False,
+                    error=f"Query failed: {result.error}"
+                )
                 
-                if result.success:
-                    # Format results
-                    formatted_results = []
-                    for row in result.results:
-                        formatted_results.append({
-                            'subject': row.get('s', ''),
-                            'property': row.get('p', ''),
-                            'object': row.get('o', '')
-                        })
-                    
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'count': len(formatted_results),
-                            'triples': formatted_results
-                        }
-                    )
-                else:
-                    return FunctionResult(
-                        success=False,
-                        error=f"Query failed: {result.error}"
-                    )
-                    
         except Exception as e:
             return FunctionResult(
                 success=False,
@@ -479,7 +459,7 @@ class ExecuteQueryFunction(BaseFunction):
             description="Execute a SPARQL query on a knowledge graph and return results"
         )
     
-    def get_definition(self) -> FunctionDefinition:
+    def _build_definition(self) -> FunctionDefinition:
         return FunctionDefinition(
             name=self.name,
             description=self.description,
@@ -511,15 +491,8 @@ class ExecuteQueryFunction(BaseFunction):
             )
         
         try:
-            # Get endpoint URL from config
-            import yaml
-            import os
-            config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            endpoints = config.get('endpoints', {})
-            endpoint_url = endpoints.get(kg)
+            # Endpoint URL from the shared, cached configuration
+            endpoint_url = get_endpoint_url(kg)
             
             if not endpoint_url:
                 return FunctionResult(
@@ -532,27 +505,27 @@ class ExecuteQueryFunction(BaseFunction):
             if limit and "LIMIT" not in query.upper():
                 query = f"{query} LIMIT {limit}"
             
-            async with QLeverClient(endpoint_url) as client:
-                result = await client.execute_query(query)
+            client = await get_shared_client(endpoint_url)
+            result = await client.execute_query(query)
+            
+            if result.success:
+                rows = result.results or []
+                columns = result.columns or []
+                return FunctionResult(
+                    success=True,
+                    result={
+                        'columns': columns,
+                        'rows': rows,
+                        'count': len(rows),
+                        'execution_time': result.execution_time
+                    }
+                )
+            else:
+                return FunctionResult(
+                    success=False,
+                    error=f"Query execution failed: {result.error}"
+                )
                 
-                if result.success:
-                    rows = result.results or []
-                    columns = result.columns or []
-                    return FunctionResult(
-                        success=True,
-                        result={
-                            'columns': columns,
-                            'rows': rows,
-                            'count': len(rows),
-                            'execution_time': result.execution_time
-                        }
-                    )
-                else:
-                    return FunctionResult(
-                        success=False,
-                        error=f"Query execution failed: {result.error}"
-                    )
-                    
         except Exception as e:
             return FunctionResult(
                 success=False,
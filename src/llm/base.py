@@ -1,7 +1,7 @@
 """Base LLM interface for different providers."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -78,6 +78,41 @@ class BaseLLM(ABC):
         """
         pass
     
+    async def generate_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[Dict]] = None,
+        function_call: Optional[Union[str, Dict]] = None,
+        on_function_call: Optional[Callable[[FunctionCall], None]] = None,
+    ) -> LLMResponse:
+        """
+        Generate a response, reporting each function call as soon as it is complete.
+        
+        Providers that support streaming call ``on_function_call`` while the
+        rest of the response is still being generated, so the caller can start
+        executing the call early. The default implementation does not stream
+        and never calls ``on_function_call``.
+        
+        Args:
+            messages: List of messages in the conversation
+            functions: List of available functions for function calling
+            function_call: Configuration for function calling
+            on_function_call: Callback for each completed function call, in order
+            
+        Returns:
+            LLMResponse object containing the complete response
+        """
+        return await self.generate(messages, functions, function_call)
+    
+    async def warmup(self) -> None:
+        """
+        Prepare the client before the first request.
+        
+        Providers can override this to open their connection pool or load the
+        model ahead of time. The default implementation does nothing.
+        """
+        return None
+    
     def format_function_for_prompt(self, function: Dict) -> str:
         """
         Format a function definition for inclusion in a prompt.
@@ -16,9 +16,16 @@ class OllamaClient(BaseLLM):
         temperature: float = 0.1,
         max_tokens: int = 2000,
         host: Optional[str] = None,
+        keep_alive: Optional[Union[float, str]] = None,
     ):
         super().__init__(model, temperature, max_tokens)
         self.host = host
+        # How long the server keeps the model (and its prompt cache) loaded,
+        # e.g. "30m" or -1 to keep it loaded indefinitely
+        self.keep_alive = keep_alive
+        # One async client for all requests, so the HTTP connection is reused
+        # and generation does not block the event loop
+        self.client = ollama.AsyncClient(host=host)
         
         # Test connection
         try:
@@ -87,9 +94,12 @@ class OllamaClient(BaseLLM):
         if tools:
             params["tools"] = tools
         
+        if self.keep_alive is not None:
+            params["keep_alive"] = self.keep_alive
+        
         # Make the API call
         try:
-            response = ollama.chat(**params)
+            response = await self.client.chat(**params)
         except Exception as e:
             raise ConnectionError(f"Ollama API call failed: {e}")
         
@@ -114,6 +124,16 @@ class OllamaClient(BaseLLM):
             finish_reason="stop",  # Ollama doesn't provide finish reason
         )
     
+    async def warmup(self) -> None:
+        """Open the connection and load the model so the first question is not slowed down."""
+        params: Dict[str, Any] = {"model": self.model, "prompt": ""}
+        if self.keep_alive is not None:
+            params["keep_alive"] = self.keep_alive
+        try:
+            await self.client.generate(**params)
+        except Exception:
+            # Best effort: a real request will surface the error
+            pass
     
     async def generate_with_tools(
         self,
@@ -1,10 +1,11 @@
 """OpenAI LLM implementation."""
 
 import json
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from openai import AsyncOpenAI
 
 from .base import BaseLLM, LLMMessage, LLMResponse, FunctionCall
+from ..functions.base import json_dumps, json_loads
 
 
 class OpenAIClient(BaseLLM):
@@ -19,8 +20,17 @@ class OpenAIClient(BaseLLM):
         base_url: Optional[str] = None,
     ):
         super().__init__(model, temperature, max_tokens)
+        # AsyncOpenAI keeps a pooled keep-alive HTTP client for all requests
         self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
     
+    async def warmup(self) -> None:
+        """Open a pooled connection to the API before the first request."""
+        try:
+            await self.client.models.list()
+        except Exception:
+            # Best effort: a real request will surface the error
+            pass
+    
     async def generate(
         self,
         messages: List[LLMMessage],
@@ -42,17 +52,7 @@ class OpenAIClient(BaseLLM):
         # OpenRouter requires tools instead of functions
         if functions and self._should_use_tools():
             # Convert functions to tools format
-            tools = []
-            for func in functions:
-                tool = {
-                    "type": "function",
-                    "function": {
-                        "name": func.get("name", ""),
-                        "description": func.get("description", ""),
-                        "parameters": func.get("parameters", {})
-                    }
-                }
-                tools.append(tool)
+            tools = self._functions_to_tools(functions)
             
             # Convert function_call to tool_choice
             tool_choice = None
@@ -81,7 +81,7 @@ class OpenAIClient(BaseLLM):
             if msg.function_call:
                 message_dict["function_call"] = {
                     "name": msg.function_call.name,
-                    "arguments": json.dumps(msg.function_call.arguments),
+                    "arguments": json_dumps(msg.function_call.arguments),
                 }
             openai_messages.append(message_dict)
         
@@ -108,7 +108,7 @@ class OpenAIClient(BaseLLM):
         function_calls = []
         if message.function_call:
             try:
-                arguments = json.loads(message.function_call.arguments)
+                arguments = json_loads(message.function_call.arguments)
             except json.JSONDecodeError:
                 arguments = {}
             
@@ -144,24 +144,23 @@ class OpenAIClient(BaseLLM):
         
         return False
     
-    async def generate_with_tools(
-        self,
-        messages: List[LLMMessage],
-        tools: Optional[List[Dict]] = None,
-        tool_choice: Optional[Union[str, Dict]] = None,
-    ) -> LLMResponse:
-        """
-        Generate a response with tool calls (OpenAI-style).
-        
-        Args:
-            messages: List of messages in the conversation
-            tools: List of available tools
-            tool_choice: Configuration for tool choice
-            
-        Returns:
-            LLMResponse object containing the response
-        """
-        # Convert messages to OpenAI format
+    @staticmethod
+    def _functions_to_tools(functions: List[Dict]) -> List[Dict]:
+        """Convert function definitions to the tools format."""
+        return [
+            {
+                "type": "function",
+                "function": {
+                    "name": func.get("name", ""),
+                    "description": func.get("description", ""),
+                    "parameters": func.get("parameters", {})
+                }
+            }
+            for func in functions
+        ]
+    
+    def _to_tool_messages(self, messages: List[LLMMessage]) -> List[Dict[str, Any]]:
+        """Convert messages to the OpenAI tools API format."""
         openai_messages = []
         for msg in messages:
             message_dict: Dict[str, Any] = {}
@@ -194,7 +193,7 @@ class OpenAIClient(BaseLLM):
                     "type": "function",
                     "function": {
                         "name": msg.function_call.name,
-                        "arguments": json.dumps(msg.function_call.arguments),
+                        "arguments": json_dumps(msg.function_call.arguments),
                     }
                 }]
                 
@@ -203,6 +202,28 @@ class OpenAIClient(BaseLLM):
             
             openai_messages.append(message_dict)
         
+        return openai_messages
+    
+    async def generate_with_tools(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[Union[str, Dict]] = None,
+    ) -> LLMResponse:
+        """
+        Generate a response with tool calls (OpenAI-style).
+        
+        Args:
+            messages: List of messages in the conversation
+            tools: List of available tools
+            tool_choice: Configuration for tool choice
+            
+        Returns:
+            LLMResponse object containing the response
+        """
+        # Convert messages to OpenAI format
+        openai_messages = self._to_tool_messages(messages)
+        
         # Prepare request parameters
         params = {
             "model": self.model,
@@ -228,7 +249,7 @@ class OpenAIClient(BaseLLM):
             for tool_call in message.tool_calls:
                 if tool_call.type == "function":
                     try:
-                        arguments = json.loads(tool_call.function.arguments)
+                        arguments = json_loads(tool_call.function.arguments)
                     except json.JSONDecodeError:
                         arguments = {}
                     
@@ -245,3 +266,96 @@ class OpenAIClient(BaseLLM):
             function_calls=function_calls,
             finish_reason=choice.finish_reason or "stop",
         )
+    
+    async def generate_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[Dict]] = None,
+        function_call: Optional[Union[str, Dict]] = None,
+        on_function_call: Optional[Callable[[FunctionCall], None]] = None,
+    ) -> LLMResponse:
+        """
+        Generate a response with streaming, reporting tool calls as they complete.
+        
+        Only the tools API is streamed; other requests fall back to generate().
+        
+        Args:
+            messages: List of messages in the conversation
+            functions: List of available functions for function calling
+            function_call: Configuration for function calling
+            on_function_call: Callback for each completed function call, in order
+            
+        Returns:
+            LLMResponse object containing the complete response
+        """
+        if not (functions and self._should_use_tools()):
+            return await self.generate(messages, functions, function_call)
+        
+        params: Dict[str, Any] = {
+            "model": self.model,
+            "messages": self._to_tool_messages(messages),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "tools": self._functions_to_tools(functions),
+            "stream": True,
+        }
+        if function_call:
+            params["tool_choice"] = function_call
+        
+        content_parts: List[str] = []
+        # Tool call fragments by index: [id, name, argument chunks]
+        partial: Dict[int, List[Any]] = {}
+        function_calls: List[FunctionCall] = []
+        finish_reason = None
+        
+        def complete(index: int):
+            tool_call_id, name, argument_parts = partial.pop(index)
+            try:
+                arguments = json_loads("".join(argument_parts) or "{}")
+            except json.JSONDecodeError:
+                arguments = {}
+            function_call_obj = FunctionCall(
+                name=name,
+                arguments=arguments,
+                tool_call_id=tool_call_id
+            )
+            function_calls.append(function_call_obj)
+            if on_function_call is not None:
+                on_function_call(function_call_obj)
+        
+        stream = await self.client.chat.completions.create(**params)
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            
+            if delta.content:
+                content_parts.append(delta.content)
+            
+            for tool_call in delta.tool_calls or []:
+                if tool_call.index not in partial:
+                    # A new call starts, so all earlier ones are complete
+                    for index in sorted(i for i in partial if i < tool_call.index):
+                        complete(index)
+                    partial[tool_call.index] = [None, "", []]
+                entry = partial[tool_call.index]
+                if tool_call.id:
+                    entry[0] = tool_call.id
+                if tool_call.function:
+                    if tool_call.function.name:
+                        entry[1] += tool_call.function.name
+                    if tool_call.function.arguments:
+                        entry[2].append(tool_call.function.arguments)
+            
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        
+        for index in sorted(partial):
+            complete(index)
+        
+        return LLMResponse(
+            content="".join(content_parts) or None,
+            function_calls=function_calls,
+            finish_reason=finish_reason or "stop",
+        )
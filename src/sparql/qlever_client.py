@@ -1,10 +1,19 @@
 """QLever SPARQL endpoint client."""
 
+import asyncio
 import json
+import weakref
 from typing import Any, Dict, List, Optional, Union
 import aiohttp
 from pydantic import BaseModel, Field
 
+from ..utils.cache import TTLCache
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional speedup
+    _json_loads = json.loads
+
 
 class SPARQLResult(BaseModel):
     """Result of a SPARQL query execution."""
@@ -19,21 +28,38 @@ class SPARQLResult(BaseModel):
 class QLeverClient:
     """Client for QLever SPARQL endpoints."""
     
-    def __init__(self, endpoint_url: str, timeout: int = 60):
+    def __init__(
+        self,
+        endpoint_url: str,
+        timeout: int = 60,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        connector_owner: bool = True,
+    ):
         """
         Initialize QLever client.
         
         Args:
             endpoint_url: URL of the QLever SPARQL endpoint
             timeout: Request timeout in seconds
+            connector: Connection pool to use, e.g. one shared between clients
+            connector_owner: Whether closing the session also closes the connector
         """
         self.endpoint_url = endpoint_url.rstrip('/')
         self.timeout = timeout
+        self.connector = connector
+        self.connector_owner = connector_owner
         self.session: Optional[aiohttp.ClientSession] = None
     
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create an HTTP session on the configured connector."""
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=self.connector_owner if self.connector is not None else True
+        )
+    
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession()
+        self.session = self._create_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -59,7 +85,7 @@ class QLeverClient:
             SPARQLResult object
         """
         # Create a session for this request if not using context manager
-        session = self.session or aiohttp.ClientSession()
+        session = self.session or self._create_session()
         close_session = not self.session
         
         try:
@@ -82,7 +108,8 @@ class QLeverClient:
                 timeout=aiohttp.ClientTimeout(total=timeout or self.timeout + 10),
             ) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    # Parsed from the raw bytes; orjson needs no separate decode step
+                    data = _json_loads(await response.read())
                     return self._parse_qlever_response(data)
                 else:
                     error_text = await response.text()
@@ -120,16 +147,13 @@ class QLeverClient:
                 bindings = data["results"]["bindings"]
                 
                 # Convert bindings to list of dictionaries
-                results = []
-                for binding in bindings:
-                    row = {}
-                    for var_name, var_value in binding.items():
-                        # Extract value based on type
-                        if "value" in var_value:
-                            row[var_name] = var_value["value"]
-                        else:
-                            row[var_name] = str(var_value)
-                    results.append(row)
+                results = [
+                    {
+                        var_name: var_value["value"] if "value" in var_value else str(var_value)
+                        for var_name, var_value in binding.items()
+                    }
+                    for binding in bindings
+                ]
                 
                 # Extract column names
                 columns = list(bindings[0].keys()) if bindings else []
@@ -178,9 +202,108 @@ class QLeverClient:
         
         info = {"endpoint": self.endpoint_url}
         
-        for name, query in queries:
-            result = await self.execute_query(query, limit=1)
+        # The statistics queries are independent, so run them concurrently
+        results = await asyncio.gather(
+            *(self.execute_query(query, limit=1) for _, query in queries)
+        )
+        for (name, _), result in zip(queries, results):
             if result.success and result.results:
                 info[name] = result.results[0].get("count", "unknown")
         
         return info
+
+
+# Long-lived clients by event loop and endpoint URL. HTTP sessions are bound
+# to the loop they were created on, so each loop gets its own clients.
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, QLeverClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_shared_client(endpoint_url: str) -> QLeverClient:
+    """
+    Get a long-lived client for an endpoint, keeping its connections alive.
+    
+    The client must not be used as a context manager or closed by the
+    caller; use close_shared_clients() when the event loop shuts down.
+    
+    Args:
+        endpoint_url: URL of the QLever SPARQL endpoint
+        
+    Returns:
+        QLeverClient with an open session
+    """
+    clients = _shared_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(endpoint_url)
+    if client is None or client.session is None or client.session.closed:
+        # Connections are kept alive between function calls, unlike the
+        # default connector's 15 second keep-alive
+        connector = aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60)
+        client = QLeverClient(endpoint_url, connector=connector)
+        await client.__aenter__()
+        clients[endpoint_url] = client
+    return client
+
+
+async def close_shared_clients() -> None:
+    """Close the shared clients of the running event loop."""
+    clients = _shared_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.__aexit__(None, None, None)
+
+
+# Queries being executed by event loop and (endpoint URL, query)
+_inflight_queries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def execute_coalesced_query(client: QLeverClient, query: str) -> SPARQLResult:
+    """
+    Execute a query, sharing the request with concurrent callers of the same query.
+    
+    Args:
+        client: QLever client to query
+        query: SPARQL query string
+        
+    Returns:
+        SPARQLResult object, shared between the callers
+    """
+    inflight = _inflight_queries.setdefault(asyncio.get_running_loop(), {})
+    key = (client.endpoint_url, query)
+    future = inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(client.execute_query(query))
+        inflight[key] = future
+        future.add_done_callback(lambda _: inflight.pop(key, None))
+    # A cancelled caller must not cancel the request for the others
+    return await asyncio.shield(future)
+
+
+# Successful results of slowly changing queries by (endpoint URL, query)
+_query_result_cache = TTLCache(maxsize=10000, ttl=3600.0)
+
+
+async def execute_cached_query(client: QLeverClient, query: str) -> SPARQLResult:
+    """
+    Execute a query, reusing a recent successful result of the same query.
+    
+    Meant for queries whose results rarely change, such as property labels
+    and statistics. The returned result is shared and must not be modified.
+    
+    Args:
+        client: QLever client to query
+        query: SPARQL query string
+        
+    Returns:
+        SPARQLResult object
+    """
+    key = (client.endpoint_url, query)
+    cached = _query_result_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    result = await execute_coalesced_query(client, query)
+    if result.success:
+        _query_result_cache.set(key, result)
+    return result
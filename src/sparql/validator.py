@@ -5,9 +5,45 @@ from typing import Dict, List, Optional, Tuple
 from .qlever_client import SPARQLResult, QLeverClient
 
 
+# Characters that may not appear in a SPARQL IRI reference (IRIREF)
+_IRI_RE = re.compile(r'[^\x00-\x20<>"{}|^`\\]+')
+
+
 class QueryValidator:
     """Validator for SPARQL queries."""
     
+    @staticmethod
+    def is_valid_iri(iri: str) -> bool:
+        """
+        Check that a string can be used as an IRI reference (<...>) in a query.
+        
+        Args:
+            iri: IRI without angle brackets
+            
+        Returns:
+            True if the IRI is non-empty and contains no forbidden characters
+        """
+        return _IRI_RE.fullmatch(iri) is not None
+    
+    @staticmethod
+    def escape_string(value: str) -> str:
+        """
+        Quote a value as a SPARQL string literal.
+        
+        Args:
+            value: Raw string value
+            
+        Returns:
+            Double-quoted literal with backslashes, quotes and line breaks escaped
+        """
+        escaped = (
+            value.replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r')
+        )
+        return f'"{escaped}"'
+    
     @staticmethod
     def validate_syntax(query: str) -> Tuple[bool, List[str]]:
         """
@@ -143,6 +143,57 @@ class WikidataSearchClient:
         except Exception:
             return None
     
+    async def get_entities_info(
+        self,
+        entity_ids: List[str],
+        language: str = "en",
+        props: str = "labels|descriptions"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get information about several entities, fetched in batches of 50.
+        
+        Args:
+            entity_ids: Wikidata entity IDs (e.g., ["Q142", "P31"])
+            language: Language code (default: "en")
+            props: Entity data to fetch, as accepted by wbgetentities
+        
+        Returns:
+            Dictionary mapping entity IDs to their information; IDs whose
+            batch failed are missing
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession(
+                headers={
+                    "Authorization": f"Bearer {self.access_token}",
+                    "User-Agent": "NL-to-SPARQL System/1.0",
+                    "Accept": "application/json"
+                }
+            )
+        
+        async def fetch_batch(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+            params = {
+                "action": "wbgetentities",
+                "format": "json",
+                "ids": "|".join(batch),
+                "languages": language,
+                "props": props,
+            }
+            try:
+                async with self.session.get(self.base_url, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        return data.get("entities", {})
+                    return {}
+            except Exception:
+                return {}
+        
+        # wbgetentities accepts at most 50 IDs per request
+        batches = [entity_ids[i:i + 50] for i in range(0, len(entity_ids), 50)]
+        entities: Dict[str, Dict[str, Any]] = {}
+        for batch_entities in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+            entities.update(batch_entities)
+        return entities
+    
     async def search_properties(
         self, 
         query: str, 
@@ -0,0 +1,65 @@
+"""In-memory caching utilities."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a fixed time.
+    
+    Cached values are shared between callers and must not be modified.
+    """
+    
+    def __init__(self, maxsize: int = 500, ttl: float = 300.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries; the least recently used is evicted first
+            ttl: Time in seconds after which an entry expires
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            default: Value to return if the key is missing or expired
+        
+        Returns:
+            Cached value or default
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return entry[1]
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,163 @@
+"""Configuration loading utilities."""
+
+import copy
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import yaml
+
+try:
+    # libyaml-backed parser, much faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+# Resolved once, so that the path is absolute and free of '..' components
+CONFIG_PATH = str(Path(__file__).resolve().parent.parent.parent / "config" / "default.yaml")
+
+# Environment variable holding the API key of each provider that needs one
+PROVIDER_API_KEY_ENV: Dict[str, str] = {
+    'openrouter': 'OPENROUTER_API_KEY',
+}
+
+# Providers served through the OpenAI-compatible client
+OPENAI_COMPATIBLE_PROVIDERS = frozenset({'openrouter'})
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    """Settings of one LLM provider from the ``llm.models`` section."""
+    
+    model: str = ""
+    temperature: float = 0.1
+    max_tokens: int = 4096
+    base_url: Optional[str] = None
+    keep_alive: Optional[Union[float, str]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ProviderConfig":
+        """Build provider settings from its config section, applying defaults."""
+        data = data or {}
+        return cls(
+            model=data.get('model', ''),
+            temperature=data.get('temperature', 0.1),
+            max_tokens=data.get('max_tokens', 4096),
+            base_url=data.get('base_url'),
+            keep_alive=data.get('keep_alive')
+        )
+
+
+@dataclass(frozen=True)
+class ResolvedConfig:
+    """
+    Structured view of the configuration file.
+    
+    Instances are shared between callers and must be treated as read-only.
+    """
+    
+    endpoints: Dict[str, str] = field(default_factory=dict)
+    providers: Dict[str, ProviderConfig] = field(default_factory=dict)
+    agent: Dict[str, Any] = field(default_factory=dict)
+    functions: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, config: Optional[Dict[str, Any]]) -> "ResolvedConfig":
+        """Resolve a raw configuration dictionary."""
+        config = config or {}
+        models_config = (config.get('llm') or {}).get('models') or {}
+        return cls(
+            endpoints=dict(config.get('endpoints') or {}),
+            providers={
+                name: ProviderConfig.from_dict(provider_config)
+                for name, provider_config in models_config.items()
+            },
+            agent=dict(config.get('agent') or {}),
+            functions=dict(config.get('functions') or {})
+        )
+
+
+# Parsed config files keyed by path: (mtime, size, raw dict, resolved view)
+_CONFIG_CACHE: "OrderedDict[str, Tuple[float, int, Dict[str, Any], ResolvedConfig]]" = OrderedDict()
+_CONFIG_CACHE_SIZE = 8
+
+
+def _read_config(path: str) -> Tuple[Dict[str, Any], ResolvedConfig]:
+    """
+    Parse a YAML config file, reusing the previous result while it is unchanged.
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    # Normalize the cache key so that equivalent spellings share one entry
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cached = _CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        _CONFIG_CACHE.move_to_end(path)
+        return cached[2], cached[3]
+    
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=_YamlLoader) or {}
+    resolved = ResolvedConfig.from_dict(config)
+    
+    _CONFIG_CACHE[path] = (stat.st_mtime, stat.st_size, config, resolved)
+    _CONFIG_CACHE.move_to_end(path)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+        _CONFIG_CACHE.popitem(last=False)
+    return config, resolved
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load configuration from YAML file.
+    
+    The file is only parsed again when its modification time or size
+    changes. Each call returns a deep copy, so callers may modify it.
+    
+    Args:
+        path: Config file to load (defaults to config/default.yaml)
+    
+    Returns:
+        Configuration dictionary, empty if the file does not exist
+    """
+    try:
+        return copy.deepcopy(_read_config(path or CONFIG_PATH)[0])
+    except FileNotFoundError:
+        return {}
+
+
+def load_resolved_config(path: Optional[str] = None) -> ResolvedConfig:
+    """
+    Load the structured view of the configuration file.
+    
+    Unlike load_config(), the result is not copied: it is built once per
+    parse of the file and shared, so it must not be modified.
+    
+    Args:
+        path: Config file to load (defaults to config/default.yaml)
+        
+    Returns:
+        ResolvedConfig, empty if the file does not exist
+    """
+    try:
+        return _read_config(path or CONFIG_PATH)[1]
+    except FileNotFoundError:
+        return ResolvedConfig()
+
+
+def get_endpoint_url(kg: Optional[str], path: Optional[str] = None) -> Optional[str]:
+    """
+    Look up the SPARQL endpoint URL of a knowledge graph.
+    
+    Args:
+        kg: Knowledge graph name, e.g. 'wikidata'
+        path: Config file to load (defaults to config/default.yaml)
+        
+    Returns:
+        Endpoint URL, or None if the knowledge graph is not configured
+    """
+    return load_resolved_config(path).endpoints.get(kg)
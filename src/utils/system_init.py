@@ -1,7 +1,6 @@
 """System initialization utilities."""
 
 from typing import Dict, Any, Optional
-import yaml
 import os
 
 from ..llm.base import BaseLLM
@@ -9,16 +8,12 @@ from ..llm.openai_client import OpenAIClient
 from ..llm.ollama_client import OllamaClient
 from ..functions.factory import create_registry
 from ..agent.orchestrator import AgentOrchestrator
-
-
-def load_config() -> Dict[str, Any]:
-    """Load configuration from YAML file."""
-    config_path = os.path.join(os.path.dirname(__file__), "../../config/default.yaml")
-    try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        return {}
+from .config import (
+    OPENAI_COMPATIBLE_PROVIDERS,
+    PROVIDER_API_KEY_ENV,
+    ResolvedConfig,
+    load_resolved_config,
+)
 
 
 def create_llm_client(
@@ -37,26 +32,23 @@ def create_llm_client(
     Returns:
         BaseLLM instance
     """
-    if config is None:
-        config = load_config()
+    resolved = ResolvedConfig.from_dict(config) if config is not None else load_resolved_config()
     
-    llm_config = config.get('llm', {}) or {}
-    models_config = llm_config.get('models', {}) or {}
-    
-    if provider not in models_config:
+    provider_config = resolved.providers.get(provider)
+    if provider_config is None:
         raise ValueError(f"Unknown provider: {provider}")
     
-    provider_config = models_config.get(provider, {}) or {}
-    model_name = model or provider_config.get('model', '')
-    temperature = provider_config.get('temperature', 0.1)
-    max_tokens = provider_config.get('max_tokens', 4096)
+    model_name = model or provider_config.model
+    temperature = provider_config.temperature
+    max_tokens = provider_config.max_tokens
     
-    if provider == 'openrouter':
-        api_key = os.getenv('OPENROUTER_API_KEY')
+    if provider in OPENAI_COMPATIBLE_PROVIDERS:
+        env_var_name = PROVIDER_API_KEY_ENV[provider]
+        api_key = os.getenv(env_var_name)
         if not api_key:
-            raise ValueError(f"OPENROUTER_API_KEY environment variable not set")
+            raise ValueError(f"{env_var_name} environment variable not set")
         
-        base_url = provider_config.get('base_url')
+        base_url = provider_config.base_url
         
         return OpenAIClient(
             model=model_name,
@@ -69,7 +61,8 @@ def create_llm_client(
         return OllamaClient(
             model=model_name,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            keep_alive=provider_config.keep_alive
         )
     else:
         raise ValueError(f"Provider '{provider}' not yet implemented")
@@ -118,7 +111,8 @@ def create_agent(
     verbose: bool = False,
     kg_name: str = "wikidata",
     ontologies: Optional[list] = None,
-    event_callback=None
+    event_callback=None,
+    llm: Optional[BaseLLM] = None
 ) -> AgentOrchestrator:
     """
     Create agent orchestrator with LLM and function registry.
@@ -133,14 +127,15 @@ def create_agent(
         kg_name: Knowledge graph name (e.g., "wikidata")
         ontologies: List of ontology file paths (relative to /ontologies directory)
         event_callback: Optional async callback for streaming events
+        llm: Existing LLM client to use instead of creating one from config
         
     Returns:
         AgentOrchestrator instance
     """
-    config = load_config()
+    config = load_resolved_config()
     
     # Read agent configuration from config
-    agent_config = config.get('agent', {}) or {}
+    agent_config = config.agent
     
     # Use config value if max_iterations not specified
     if max_iterations is None:
@@ -151,9 +146,12 @@ def create_agent(
         enable_feedback = agent_config.get('enable_feedback', True)
     if max_feedback_loops == 2:
         max_feedback_loops = agent_config.get('max_feedback_loops', 2)
+    parallel_tools = agent_config.get('parallel_tools', True)
+    async_function_calls = agent_config.get('async_function_calls', False)
     
-    # Create LLM client
-    llm = create_llm_client(provider=provider, model=model, config=config)
+    # Create LLM client unless the caller already has one
+    if llm is None:
+        llm = create_llm_client(provider=provider, model=model)
     
     # Create function registry for the specific knowledge graph
     function_registry = create_function_registry(kg_name)
@@ -182,7 +180,15 @@ def create_agent(
         max_feedback_loops=max_feedback_loops,
         verbose=verbose,
         ontology_content=ontology_content,
-        event_callback=event_callback
+        event_callback=event_callback,
+        parallel_tools=parallel_tools,
+        async_function_calls=async_function_calls,
+        max_concurrency=agent_config.get('max_concurrency', 4),
+        max_tool_result_chars=agent_config.get('max_tool_result_chars', 20000),
+        history_window=agent_config.get('history_window'),
+        include_history=agent_config.get('include_history', False),
+        speculative_execution=agent_config.get('speculative_execution', False),
+        stream_function_calls=agent_config.get('stream_function_calls', True)
     )
     
     return agent
@@ -190,5 +196,4 @@ def create_agent(
 
 def get_available_endpoints() -> Dict[str, str]:
     """Get available knowledge graph endpoints."""
-    config = load_config()
-    return config.get('endpoints', {})
+    return dict(load_resolved_config().endpoints)
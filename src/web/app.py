@@ -10,7 +10,9 @@ from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from ..utils.system_init import create_agent, load_config
+from ..sparql.qlever_client import close_shared_clients
+from ..utils.config import load_config
+from ..utils.system_init import create_agent
 
 app = FastAPI(title="NLtoSPARQL Web", version="0.1.0")
 
@@ -19,6 +21,12 @@ static_dir = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the pooled SPARQL endpoint connections."""
+    await close_shared_clients()
+
+
 class QueryRequest(BaseModel):
     question: str
     provider: str = "ollama"
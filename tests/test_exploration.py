@@ -0,0 +1,78 @@
+"""Tests for the schema exploration functions."""
+
+import asyncio
+import re
+
+from src.functions.exploration import FindRelationshipPathsFunction
+from src.sparql import qlever_client
+from src.sparql.qlever_client import QLeverClient, SPARQLResult
+
+
+def _iri(name):
+    return f"http://example.org/{name}"
+
+
+def _hub_graph():
+    """A hub entity whose only path to the target runs through its last neighbour."""
+    edges = [(_iri("hub"), _iri("p"), _iri(f"m{i}")) for i in range(1500)]
+    edges.append((_iri("m1499"), _iri("q"), _iri("target")))
+    return edges
+
+
+def _fake_execute(edges):
+    """Answer the path search queries by evaluating them over a list of edges."""
+    async def execute_query(self, query, limit=None, timeout=None):
+        limit = int(re.search(r"LIMIT (\d+)", query).group(1))
+        nodes_block = re.search(r"VALUES \?node \{([^}]*)\}", query)
+        nodes = set(re.findall(r"<([^>]+)>", nodes_block.group(1))) if nodes_block else set()
+        visited_block = re.search(r"MINUS \{ VALUES \?next \{([^}]*)\}", query)
+        visited = set(re.findall(r"<([^>]+)>", visited_block.group(1))) if visited_block else set()
+        
+        rows = []
+        if "?last_property" in query:
+            target = re.search(r"\?last_property <([^>]+)>", query).group(1)
+            for s, p, o in edges:
+                if s in nodes and o not in visited:
+                    rows.extend(
+                        {"node": s, "property": p, "next": o, "last_property": p2}
+                        for s2, p2, o2 in edges if s2 == o and o2 == target
+                    )
+        elif "?next" in query:
+            rows = [
+                {"node": s, "property": p, "next": o}
+                for s, p, o in edges if s in nodes and o not in visited
+            ]
+        else:
+            source, target = re.search(r"<([^>]+)> \?property <([^>]+)>", query).groups()
+            rows = [{"property": p} for s, p, o in edges if s == source and o == target]
+        return SPARQLResult(success=True, results=rows[:limit], columns=[])
+    
+    return execute_query
+
+
+def _find_paths(monkeypatch, max_path_length):
+    monkeypatch.setattr(QLeverClient, "execute_query", _fake_execute(_hub_graph()))
+    
+    async def run():
+        try:
+            return await FindRelationshipPathsFunction().execute(
+                kg="dblp",
+                entity1=_iri("hub"),
+                entity2=_iri("target"),
+                max_path_length=max_path_length
+            )
+        finally:
+            await qlever_client.close_shared_clients()
+    
+    return asyncio.run(run())
+
+
+def test_two_hop_paths_of_hub_entity_are_found(monkeypatch):
+    for max_path_length in (2, 3):
+        result = _find_paths(monkeypatch, max_path_length)
+        
+        assert result.success
+        assert result.result["paths"] == [{
+            "path": f"{_iri('p')} → {_iri('m1499')} → {_iri('q')}",
+            "length": 2
+        }]